@@ -7,55 +7,111 @@
 import tcod.ecs.callbacks
 
 import game.actions
+from component.location import Location
 from engine.helpers import active_zone
+from game.action import Success
 
 if TYPE_CHECKING:
-    import tqueue.tqueue
-
+    from engine.turn_queue import Ticket
     from game.action import Action
 
 
 @attrs.define(kw_only=True)
 class Actor:
     controlled: bool = False
-    ticket: tqueue.tqueue.Ticket[tcod.ecs.Entity] | None = None
+    ticket: Ticket[tcod.ecs.Entity] | None = None
     action: Action | None = None
+    sleeping_room: int | None = None  # The room this actor is sleeping in, None while awake.
 
     @staticmethod
     def schedule(entity: tcod.ecs.Entity, interval: int) -> None:
         self = entity.components[Actor]
         assert self.ticket is None
-        self.ticket = active_zone().tqueue.schedule(interval, entity)
-        if active_zone().player is entity:
-            active_zone().player = None
+        zone = active_zone(entity.registry)
+        self.ticket = zone.tqueue.schedule(interval, entity)
+        if zone.player is entity:
+            zone.player = None
+
+    @staticmethod
+    def sleep(entity: tcod.ecs.Entity) -> None:
+        """Stop scheduling `entity` until it is woken.
+
+        Sleeping actors are woken by `wake`, which `Zone.wake_room` calls when a controlled actor enters their room or
+        when a door of their room opens.  Interacting with an actor also wakes it.
+        """
+        self = entity.components[Actor]
+        assert self.ticket is None
+        location = entity.components[Location]
+        self.sleeping_room = int(location.zone.cells["room_id"][location.xyz])
+        location.zone.sleepers.setdefault(self.sleeping_room, {})[entity] = None
+
+    @staticmethod
+    def wake(entity: tcod.ecs.Entity) -> None:
+        """Schedule a sleeping `entity` to act now, does nothing if it's already awake."""
+        self = entity.components[Actor]
+        if self.sleeping_room is None:
+            return
+        del active_zone(entity.registry).sleepers[self.sleeping_room][entity]
+        self.sleeping_room = None
+        self.schedule(entity, 0)
 
     @classmethod
     def act(cls, entity: tcod.ecs.Entity) -> Action:  # noqa: ARG003
-        return game.actions.wait
+        """Return the next action of an uncontrolled actor, which sleeps until woken by default."""
+        return game.actions.Standby()
 
     @classmethod
-    def call(cls, ticket: tqueue.tqueue.Ticket[tcod.ecs.Entity], entity: tcod.ecs.Entity) -> None:
+    def call(cls, ticket: Ticket[tcod.ecs.Entity], entity: tcod.ecs.Entity) -> None:
         self = entity.components[Actor]
         if self.ticket is ticket:
             self.ticket = None
             self.action = None
             if not self.controlled:
-                self.action = cls.act(entity)
-                if not self.action.__call__(entity):
-                    self.schedule(entity, 100)
+                self.take_turns(entity)
             else:
                 game.actions.PlayerControl().__call__(entity)
 
+    def take_turns(self, entity: tcod.ecs.Entity) -> None:
+        """Act and then schedule the next call after the time taken.
+
+        Actors far from the camera take several turns in a row, as given by `Zone.get_detail_turns`, and stop early once
+        they come back within range.  An impossible action waits out the rest of those turns.
+        """
+        zone = active_zone(entity.registry)
+        time_cost = 0
+        turn = 0
+        turns = 1
+        while turn < turns:
+            self.action = self.act(entity)
+            result = self.action.__call__(entity)
+            if self.ticket is not None or self.sleeping_room is not None:
+                return  # Already scheduled or sleeping.
+            turn += 1
+            turns = zone.get_detail_turns(entity.components[Location].xyz)
+            match result:
+                case Success(time_cost=action_time):
+                    time_cost += action_time
+                case _:
+                    time_cost += 100 * max(1, turns - turn + 1)
+                    break
+        self.schedule(entity, time_cost)
+
     def is_controlled(self) -> bool:
         return self.controlled
 
     @staticmethod
     def take_control(entity: tcod.ecs.Entity) -> None:
         self = entity.components[Actor]
-        self.interrupt(force=True)
+        self.wake(entity)
+        self.interrupt(entity, force=True)
         game.actions.PlayerControl().__call__(entity)
 
-    def interrupt(self, *, force: bool = False) -> None:  # noqa: ARG002
+    @staticmethod
+    def interrupt(entity: tcod.ecs.Entity, *, force: bool = False) -> None:  # noqa: ARG004
+        """Cancel the scheduled turn and the current action of `entity`."""
+        self = entity.components[Actor]
+        if self.ticket is not None:
+            active_zone(entity.registry).tqueue.cancel(self.ticket)
         self.ticket = None
         self.action = None
 
@@ -65,7 +121,25 @@ def on_actor_changed(entity: tcod.ecs.Entity, old: Actor | None, new: Actor | No
     """Handle scheduling on Actor components being added and removed."""
     if old == new:
         return
-    if old is not None:
-        entity.components[Actor].ticket = None
+    if old is not None and old.ticket is not None:
+        active_zone(entity.registry).tqueue.cancel(old.ticket)
+        old.ticket = None
+    if old is not None and old.sleeping_room is not None:
+        del active_zone(entity.registry).sleepers[old.sleeping_room][entity]
+        old.sleeping_room = None
     if new is not None:
         Actor.schedule(entity, 0)
+    if (old is None) != (new is None) and Location in entity.components:
+        # Blocking actors are left out of the zone's static costs.
+        location = entity.components[Location]
+        location.zone.update_cost(location.xyz)
+
+
+@tcod.ecs.callbacks.register_component_changed(component=Location)
+def on_actor_moved(entity: tcod.ecs.Entity, old: Location | None, new: Location | None) -> None:
+    """Wake the actors sleeping in rooms entered by a controlled actor."""
+    if new is None or Actor not in entity.components or not entity.components[Actor].controlled:
+        return
+    room_id = int(new.zone.cells["room_id"][new.xyz])
+    if old is None or old.zone is not new.zone or room_id != int(old.zone.cells["room_id"][old.xyz]):
+        new.zone.wake_room(room_id)
@@ -11,8 +11,14 @@
     import engine.zone
 
 
-@attrs.define(frozen=True)
+@attrs.define(frozen=True, eq=False)
 class Location:
+    """A position in a zone.
+
+    Locations are interned by their zone and must be created with `zone[x, y, z]`, so they compare and hash by
+    identity.
+    """
+
     zone: engine.zone.Zone
     x: int
     y: int
@@ -20,7 +26,7 @@ class Location:
 
     def get_relative(self, x: int, y: int, z: int = 0) -> Location:
         """Return a location relative to this one."""
-        return Location(self.zone, self.x + x, self.y + y, self.z + z)
+        return self.zone[self.x + x, self.y + y, self.z + z]
 
     def is_adjacent(self, other: Location) -> bool:
         """Return True if this location is at most one tile away from `other`."""
@@ -38,19 +44,20 @@ def xyz(self) -> tuple[int, int, int]:
 
     @property
     def data(self) -> NDArray[Any]:
-        return self.zone.data[self.x, self.y, self.z]  # type: ignore[no-any-return]
+        return self.zone.data[self.x, self.y, self.z]
 
     def __add__(self, other: tuple[int, int, int]) -> Location:
         """Return a location relative to this one."""
         x, y, z = other
-        return self.__class__(self.zone, self.x + x, self.y + y, self.z + z)
+        return self.zone[self.x + x, self.y + y, self.z + z]
 
 
 @tcod.ecs.callbacks.register_component_changed(component=Location)
 def on_location_changed(entity: tcod.ecs.Entity, old: Location | None, new: Location | None) -> None:
+    """Keep the spatial index of each zone up to date."""
     if old == new:
         return
     if old is not None:
-        entity.tags.remove(old)
+        old.zone.remove_entity(old.xyz, entity)
     if new is not None:
-        entity.tags.add(new)
+        new.zone.add_entity(new.xyz, entity)
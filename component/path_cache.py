@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import attrs
+import tcod.path
+
+if TYPE_CHECKING:
+    from component.location import Location
+
+
+@attrs.define()
+class PathCache:
+    """The remaining path of an actor following a target.
+
+    The path is only computed again when the target leaves the end of the path, when the next step is blocked, or
+    when the zone's `static_cost_version` changes. A target unreachable because of the static costs is also remembered
+    until one of these happens, but a target which is only cut off by other actors is tried again every call.
+    """
+
+    path: list[tuple[int, int, int]] = attrs.Factory(list)  # Remaining steps, the next step is last.
+    target_xyz: tuple[int, int, int] | None = None
+    version: int = -1  # The `Zone.static_cost_version` this path and `pathfinder` were computed with.
+    pathfinder: tcod.path.AStar | None = None
+    pathfinder_z: int = -1
+    blocked: bool = False  # True if the empty `path` is because other actors are in the way.
+    hits: int = 0
+    misses: int = 0
+
+    def get_step(self, origin: Location, target: Location) -> tuple[int, int, int] | None:
+        """Return the next step from `origin` towards `target`, or None if `target` is adjacent or unreachable."""
+        if self.is_valid(origin, target):
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.compute(origin, target)
+        if len(self.path) <= 1:
+            return None
+        return self.path[-1]
+
+    def advance(self) -> None:
+        """Remove the next step after it has been taken."""
+        self.path.pop()
+
+    def is_valid(self, origin: Location, target: Location) -> bool:
+        """Return True if the cached path from `origin` to `target` can still be followed."""
+        if self.target_xyz != target.xyz or self.version != origin.zone.static_cost_version:
+            return False
+        if not self.path:
+            return not self.blocked  # Still unreachable, unless the actors in the way could have moved.
+        x, y, z = self.path[-1]
+        if z != origin.z or max(abs(x - origin.x), abs(y - origin.y)) != 1:
+            return False  # Moved off of the path.
+        return len(self.path) <= 1 or bool(origin.zone.cost[x, y, z])
+
+    def compute(self, origin: Location, target: Location) -> None:
+        """Compute a new path from `origin` to `target`.
+
+        Paths are planned over the zone's room graph, other actors are only walked around when they block the next step.
+        """
+        zone = origin.zone
+        if self.pathfinder is None or self.pathfinder_z != origin.z or self.version != zone.static_cost_version:
+            # A live view of the zone costs, so this stays valid as entities move.
+            self.pathfinder = tcod.path.AStar(zone.cost[:, :, origin.z])
+            self.pathfinder_z = origin.z
+        self.target_xyz = target.xyz
+        self.version = zone.static_cost_version
+        self.path = zone.room_paths.get_path(origin.xyz, target.xyz)[::-1]
+        self.blocked = False
+        if len(self.path) <= 1 or zone.cost[self.path[-1]]:
+            return
+        self.path = []
+        self.blocked = True
+        if origin.z != target.z:
+            return
+        # The target usually blocks its own tile, which would leave it unreachable.
+        target_cost = zone.cost[target.xyz]
+        zone.cost[target.xyz] = 1
+        try:
+            path = self.pathfinder.get_path(origin.x, origin.y, target.x, target.y)
+        finally:
+            zone.cost[target.xyz] = target_cost
+        self.path = [(x, y, origin.z) for x, y in reversed(path)]
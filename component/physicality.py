@@ -1,4 +1,10 @@
+from __future__ import annotations
+
 import attrs
+import tcod.ecs
+import tcod.ecs.callbacks
+
+from component.location import Location
 
 
 @attrs.define()
@@ -8,3 +14,13 @@ class Physicality:
     move_speed: int = 100
     blocking: bool = True
     hp: int = 100
+
+
+@tcod.ecs.callbacks.register_component_changed(component=Physicality)
+def on_physicality_changed(entity: tcod.ecs.Entity, old: Physicality | None, new: Physicality | None) -> None:
+    """Keep the movement costs of the zone up to date, `blocking` must be changed by assigning a new component."""
+    if (old is not None and old.blocking) == (new is not None and new.blocking):
+        return
+    location = entity.components.get(Location)
+    if location is not None:
+        location.zone.update_cost(location.xyz)
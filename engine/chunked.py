@@ -0,0 +1,224 @@
+"""Lazily allocated chunked arrays."""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+# A 3D index made only of integers and slices.
+Region = tuple[slice, slice, slice]
+
+
+class ChunkedArray:
+    """A 3D structured array split into fixed size chunks which are only allocated once written to.
+
+    Chunks which were never written share a read-only default chunk filled with `fill_value`.
+    Writes which don't change a chunk from `fill_value` don't allocate it.
+
+    This supports the subset of the NumPy array interface used by `engine.zone.Zone`:
+    basic indexing and slicing (step 1) returns stitched copies, indexing by a field name returns a `ChunkedField`,
+    and other indexes such as index arrays or boolean masks are gathered from or scattered to each chunk they touch.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, int, int],
+        dtype: DTypeLike,
+        chunk_shape: tuple[int, int, int],
+        fill_value: Any = None,  # noqa: ANN401
+    ) -> None:
+        """Initialize an array where every cell is `fill_value`, or zero if `fill_value` is None."""
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+        self.chunk_shape = chunk_shape
+        self.chunks: dict[tuple[int, int, int], NDArray[Any]] = {}
+        self.fill(np.zeros((), dtype=self.dtype)[()] if fill_value is None else fill_value)
+
+    def fill(self, value: Any) -> None:  # noqa: ANN401
+        """Set every cell to `value`, this frees all chunks."""
+        self.fill_value = np.array(value, dtype=self.dtype)[()]
+        self.default_chunk = np.full(self.chunk_shape, self.fill_value, dtype=self.dtype)
+        self.default_chunk.flags.writeable = False
+        self.chunks = {}
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes used by allocated chunks."""
+        return sum(chunk.nbytes for chunk in self.chunks.values()) + self.default_chunk.nbytes
+
+    def astype(self, dtype: DTypeLike) -> ChunkedArray:
+        """Return a copy of this array converted to `dtype`."""
+        result = ChunkedArray(self.shape, dtype, self.chunk_shape, self.fill_value.astype(dtype))
+        result.chunks = {key: chunk.astype(dtype) for key, chunk in self.chunks.items()}
+        return result
+
+    def __getitem__(self, key: Any) -> Any:  # noqa: ANN401
+        """Return a field view by name, or a copy of the cells at an index."""
+        if isinstance(key, str):
+            return ChunkedField(self, key)
+        return self.read(key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:  # noqa: ANN401
+        """Assign to a field by name or to the cells at an index."""
+        if isinstance(key, str):
+            self.write(..., value, key)
+        else:
+            self.write(key, value)
+
+    def _normalize(self, key: Any) -> tuple[Region, tuple[int, ...]] | None:  # noqa: ANN401
+        """Convert a basic index into a region and the axes to drop from the result.
+
+        Returns None for advanced indexes, which are handled by `_points`.
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(index is Ellipsis for index in key):
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (len(self.shape) - len(key) + 1) + key[i + 1 :]
+        key = key + (slice(None),) * (len(self.shape) - len(key))
+        region = []
+        dropped = []
+        for axis, (index, size) in enumerate(zip(key, self.shape, strict=True)):
+            if isinstance(index, slice):
+                start, stop, step = index.indices(size)
+                assert step == 1, "Slices with steps are not supported."
+                region.append(slice(start, max(start, stop)))
+            elif isinstance(index, (int, np.integer)):
+                i = int(index) + size if index < 0 else int(index)
+                if not 0 <= i < size:
+                    msg = f"Index {index} is out of bounds for axis {axis} with size {size}."
+                    raise IndexError(msg)
+                region.append(slice(i, i + 1))
+                dropped.append(axis)
+            else:
+                return None
+        x, y, z = region
+        return (x, y, z), tuple(dropped)
+
+    def _iter_chunks(self, region: Region) -> Iterator[tuple[tuple[int, int, int], Region, Region]]:
+        """Yield `(chunk_key, chunk_index, region_index)` for each chunk overlapping `region`."""
+        ranges = [
+            range(index.start // size, (index.stop - 1) // size + 1) if index.stop > index.start else range(0)
+            for index, size in zip(region, self.chunk_shape, strict=True)
+        ]
+        for chunk_key in itertools.product(*ranges):
+            chunk_index = []
+            region_index = []
+            for i, index, size in zip(chunk_key, region, self.chunk_shape, strict=True):
+                start = max(index.start, i * size)
+                stop = min(index.stop, (i + 1) * size)
+                chunk_index.append(slice(start - i * size, stop - i * size))
+                region_index.append(slice(start - index.start, stop - index.start))
+            cx, cy, cz = chunk_key
+            chunk_x, chunk_y, chunk_z = chunk_index
+            region_x, region_y, region_z = region_index
+            yield (cx, cy, cz), (chunk_x, chunk_y, chunk_z), (region_x, region_y, region_z)
+
+    def _points(self, key: Any) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.intp]]:  # noqa: ANN401
+        """Return the coordinates of the cells selected by an advanced index, each shaped like the result.
+
+        The index is applied to zero-stride views of open coordinate grids, so NumPy handles every index form such as
+        index arrays mixed with slices, boolean masks, or fewer than 3 indexes, without allocating the full shape.
+        """
+        width, height, depth = self.shape
+        x, y, z = (np.broadcast_to(grid, self.shape)[key] for grid in np.ogrid[:width, :height, :depth])
+        return x, y, z
+
+    def _group_points(
+        self,
+        x: NDArray[np.intp],
+        y: NDArray[np.intp],
+        z: NDArray[np.intp],
+    ) -> Iterator[tuple[tuple[int, int, int], NDArray[np.bool_], tuple[NDArray[np.intp], ...]]]:
+        """Yield `(chunk_key, selected, points)` for each chunk holding some of the points at `x`, `y`, `z`.
+
+        `selected` masks the points in that chunk and `points` indexes them within the chunk.
+        """
+        chunk_points = [np.divmod(axis, size) for axis, size in zip((x, y, z), self.chunk_shape, strict=True)]
+        keys = np.stack([chunk_axis for chunk_axis, _ in chunk_points], axis=-1).reshape(-1, 3)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(x.shape)
+        for i, (cx, cy, cz) in enumerate(unique.tolist()):
+            selected = inverse == i
+            yield (cx, cy, cz), selected, tuple(local[selected] for _, local in chunk_points)
+
+    def read(self, key: Any, field: str | None = None) -> Any:  # noqa: ANN401
+        """Return a copy of the cells (or one field of them) at `key`."""
+        dtype = self.dtype if field is None else self.dtype[field]
+        normalized = self._normalize(key)
+        if normalized is None:
+            x, y, z = self._points(key)
+            out = np.empty(x.shape, dtype=dtype)
+            for chunk_key, selected, points in self._group_points(x, y, z):
+                chunk = self.chunks.get(chunk_key, self.default_chunk)
+                out[selected] = chunk[points] if field is None else chunk[field][points]
+            return out[()] if out.ndim == 0 else out
+        region, dropped = normalized
+        out = np.empty(tuple(index.stop - index.start for index in region), dtype=dtype)
+        for chunk_key, chunk_index, region_index in self._iter_chunks(region):
+            chunk = self.chunks.get(chunk_key, self.default_chunk)
+            out[region_index] = chunk[chunk_index] if field is None else chunk[field][chunk_index]
+        out = out.squeeze(axis=dropped) if dropped else out
+        return out[()] if len(dropped) == len(self.shape) else out
+
+    def write(self, key: Any, value: Any, field: str | None = None) -> None:  # noqa: ANN401
+        """Assign `value` to the cells (or one field of them) at `key`."""
+        dtype = self.dtype if field is None else self.dtype[field]
+        fill_value = self.fill_value if field is None else self.fill_value[field]
+        normalized = self._normalize(key)
+        if normalized is None:
+            x, y, z = self._points(key)
+            values = np.broadcast_to(np.asarray(value, dtype=dtype), x.shape)
+            for chunk_key, selected, points in self._group_points(x, y, z):
+                chunk_values = values[selected]
+                chunk = self.chunks.get(chunk_key)
+                if chunk is None:
+                    if np.all(chunk_values == fill_value):
+                        continue  # This chunk would still be the default.
+                    chunk = self.chunks[chunk_key] = self.default_chunk.copy()
+                if field is None:
+                    chunk[points] = chunk_values
+                else:
+                    chunk[field][points] = chunk_values
+            return
+        region, dropped = normalized
+        shape = tuple(index.stop - index.start for index in region)
+        kept_shape = tuple(size for axis, size in enumerate(shape) if axis not in dropped)
+        values = np.broadcast_to(np.asarray(value, dtype=dtype), kept_shape).reshape(shape)
+        for chunk_key, chunk_index, region_index in self._iter_chunks(region):
+            chunk_values = values[region_index]
+            chunk = self.chunks.get(chunk_key)
+            if chunk is None:
+                if np.all(chunk_values == fill_value):
+                    continue  # This chunk would still be the default.
+                chunk = self.chunks[chunk_key] = self.default_chunk.copy()
+            if field is None:
+                chunk[chunk_index] = chunk_values
+            else:
+                chunk[field][chunk_index] = chunk_values
+
+
+class ChunkedField:
+    """A view of one field of a `ChunkedArray`."""
+
+    def __init__(self, array: ChunkedArray, field: str) -> None:
+        """Initialize a view of `field` in `array`."""
+        self.array = array
+        self.field = field
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """The shape of the viewed array."""
+        return self.array.shape
+
+    def __getitem__(self, key: Any) -> Any:  # noqa: ANN401
+        """Return a copy of this field at an index."""
+        return self.array.read(key, self.field)
+
+    def __setitem__(self, key: Any, value: Any) -> None:  # noqa: ANN401
+        """Assign to this field at an index."""
+        self.array.write(key, value, self.field)
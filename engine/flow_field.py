@@ -0,0 +1,62 @@
+"""Shared distance maps for moving many actors toward one goal."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import tcod.path
+from numpy.typing import NDArray
+
+if TYPE_CHECKING:
+    import engine.zone
+
+# Step costs matching the time taken by cardinal and diagonal moves.
+CARDINAL_COST = 2
+DIAGONAL_COST = 3
+NEIGHBORS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+class FlowField:
+    """Distances from every cell of one level of a zone to a goal.
+
+    Distances are computed over `Zone.static_cost` and are only computed again when the goal moves or when the
+    static costs change, so any number of actors can follow this field for the price of one Dijkstra search.
+    Actors blocking the way are avoided when a step is taken instead.
+    """
+
+    def __init__(self, zone: engine.zone.Zone) -> None:
+        """Initialize an empty field over `zone`."""
+        self.zone = zone
+        self.goal: tuple[int, int, int] | None = None
+        self.version = -1  # The `Zone.static_cost_version` the distances were computed with.
+        self.distance: NDArray[np.int32] = np.zeros((0, 0), dtype=np.int32)
+
+    def set_goal(self, goal: tuple[int, int, int]) -> None:
+        """Move the goal to `goal`, recomputing the distances if the goal or the zone costs changed."""
+        static_cost = self.zone.static_cost  # Builds the costs and updates the version if needed.
+        if goal == self.goal and self.version == self.zone.static_cost_version:
+            return
+        x, y, z = goal
+        self.distance = tcod.path.maxarray(static_cost.shape[:2], dtype=np.int32, order="F")
+        self.distance[x, y] = 0
+        tcod.path.dijkstra2d(self.distance, static_cost[:, :, z], CARDINAL_COST, DIAGONAL_COST, out=self.distance)
+        self.goal = goal
+        self.version = self.zone.static_cost_version
+
+    def get_step(self, xyz: tuple[int, int, int]) -> tuple[int, int, int] | None:
+        """Return the free neighbor of `xyz` which is closest to the goal, or None if no free neighbor is closer."""
+        if self.goal is None or xyz[2] != self.goal[2]:
+            return None
+        x, y, z = xyz
+        width, height = self.distance.shape
+        best = None
+        best_distance = self.distance[x, y]
+        for dx, dy in NEIGHBORS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            if self.distance[nx, ny] < best_distance and self.zone.cost[nx, ny, z]:
+                best = nx, ny, z
+                best_distance = self.distance[nx, ny]
+        return best
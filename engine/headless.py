@@ -0,0 +1,217 @@
+"""Run the simulation without a window, for soak tests and measuring simulation speed.
+
+Example::
+
+    python -m engine.headless --seed 1 --turns 10000 --record game.journal
+    python -m engine.headless --replay game.journal
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import attrs
+
+import engine.model
+import g
+import game.actions
+from engine.helpers import active_zone, get_controlled_actor
+from engine.journal import DEFAULT_CHECKSUM_INTERVAL, JournalWriter, read_journal
+from game.action_logic import do_action
+
+if TYPE_CHECKING:
+    from game.action import Action
+
+# Player commands by name, these match the key bindings of `game.states.Game`.
+COMMANDS: dict[str, Action] = {
+    "n": game.actions.Bump((0, -1, 0)),
+    "ne": game.actions.Bump((1, -1, 0)),
+    "e": game.actions.Bump((1, 0, 0)),
+    "se": game.actions.Bump((1, 1, 0)),
+    "s": game.actions.Bump((0, 1, 0)),
+    "sw": game.actions.Bump((-1, 1, 0)),
+    "w": game.actions.Bump((-1, 0, 0)),
+    "nw": game.actions.Bump((-1, -1, 0)),
+    "wait": game.actions.wait,
+    "pickup": game.actions.PickupGeneral(),
+    "cancel": game.actions.ReturnControlToPlayer(),
+}
+
+
+@attrs.define(frozen=True)
+class Report:
+    """The results of a headless run."""
+
+    turns: int  # The player commands which were run.
+    time: int  # The game time at the end of the run.
+    seconds: float
+    peak_memory: int | None  # Peak bytes traced by `tracemalloc`, or the peak resident size of the process.
+    state_hash: str
+    player_died: bool
+    diverged_at: int | None = None  # The first turn which didn't match a checksum of a replayed journal.
+
+    def __str__(self) -> str:
+        """Return this report as one line per result."""
+        lines = [
+            f"turns: {self.turns}",
+            f"game time: {self.time}",
+            f"seconds: {self.seconds:.3f}",
+            f"turns per second: {self.turns / self.seconds if self.seconds else 0:.1f}",
+            f"peak memory: {'unknown' if self.peak_memory is None else f'{self.peak_memory / 2**20:.1f} MiB'}",
+            f"state hash: {self.state_hash}",
+        ]
+        if self.player_died:
+            lines.append("the player died")
+        if self.diverged_at is not None:
+            lines.append(f"diverged from the journal at turn {self.diverged_at}")
+        return "\n".join(lines)
+
+
+def get_peak_rss() -> int | None:
+    """Return the peak resident memory of this process in bytes, or None on platforms without `resource`."""
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:  # Windows.
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports kibibytes.
+
+
+def random_commands(seed: int) -> Iterator[Action]:
+    """Yield random commands forever, seeded by `seed`."""
+    rng = random.Random(seed)
+    names = sorted(COMMANDS)
+    while True:
+        yield COMMANDS[rng.choice(names)]
+
+
+def read_commands(path: Path) -> list[Action]:
+    """Return the commands of a script with one command name per line, blank lines and `#` comments are skipped."""
+    commands = []
+    for line_number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        name = line.partition("#")[0].strip()
+        if not name:
+            continue
+        if name not in COMMANDS:
+            msg = f"{path}:{line_number}: unknown command {name!r}, expected one of {', '.join(COMMANDS)}"
+            raise ValueError(msg)
+        commands.append(COMMANDS[name])
+    return commands
+
+
+def run(  # noqa: PLR0913
+    seed: int,
+    turns: int,
+    commands: Iterable[Action],
+    *,
+    checksums: Mapping[int, str] | None = None,
+    record: Path | None = None,
+    checksum_interval: int = DEFAULT_CHECKSUM_INTERVAL,
+    trace_memory: bool = False,
+) -> Report:
+    """Build the world for `seed` and run up to `turns` of `commands` as the controlled actor.
+
+    Stops early if the commands run out, the player dies, or the state doesn't match one of `checksums`, which are
+    state hashes by turn.  The run is recorded to a journal at `record` if given.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    engine.model.init(seed)
+    zone = active_zone()
+    zone.simulate()
+    journal = None if record is None else JournalWriter(record, seed, checksum_interval)
+    turns_run = 0
+    player_died = False
+    diverged_at = None
+    start = time.perf_counter()
+    try:
+        for turn, action in zip(range(turns), commands, strict=False):
+            if checksums and turn in checksums and engine.model.get_state_hash(g.world) != checksums[turn]:
+                diverged_at = turn
+                break
+            if journal is not None:
+                journal.record(g.world, action)
+            do_action(get_controlled_actor(), action)
+            turns_run += 1
+            zone.simulate()
+    except SystemExit:  # Raised by `Zone.simulate` when the player dies.
+        player_died = True
+    finally:
+        if journal is not None:
+            journal.close()
+    seconds = time.perf_counter() - start
+    peak_memory: int | None
+    if trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    else:
+        peak_memory = get_peak_rss()
+    return Report(
+        turns=turns_run,
+        time=zone.tqueue.time,
+        seconds=seconds,
+        peak_memory=peak_memory,
+        state_hash=engine.model.get_state_hash(g.world),
+        player_died=player_died,
+        diverged_at=diverged_at,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the headless simulation from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=1, help="the ship seed, also seeds random inputs")
+    parser.add_argument("--turns", type=int, default=1000, help="the number of player commands to run")
+    parser.add_argument("--script", type=Path, help="a file of commands to run instead of random inputs")
+    parser.add_argument("--input-seed", type=int, help="seed random inputs separately from the ship")
+    parser.add_argument("--replay", type=Path, help="replay the seed and actions of a journal at full speed")
+    parser.add_argument("--no-verify", action="store_true", help="skip comparing checksums while replaying")
+    parser.add_argument("--record", type=Path, help="record the actions of this run to a journal")
+    parser.add_argument(
+        "--checksum-interval",
+        type=int,
+        default=DEFAULT_CHECKSUM_INTERVAL,
+        help="turns between the state checksums of a recorded journal, 0 for none",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="report the peak memory traced by tracemalloc instead of the process size, this slows the run",
+    )
+    args = parser.parse_args(argv)
+    seed = args.seed
+    turns = args.turns
+    checksums = None
+    if args.replay is not None:
+        journal = read_journal(args.replay)
+        seed = journal.seed
+        turns = len(journal.actions)
+        commands: Iterable[Action] = journal.actions
+        checksums = None if args.no_verify else journal.checksums
+    elif args.script is not None:
+        commands = read_commands(args.script)
+    else:
+        commands = random_commands(args.seed if args.input_seed is None else args.input_seed)
+    report = run(
+        seed,
+        turns,
+        commands,
+        checksums=checksums,
+        record=args.record,
+        checksum_interval=args.checksum_interval,
+        trace_memory=args.trace_memory,
+    )
+    print(report)
+    if report.diverged_at is not None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,9 @@
 import g
 
 
-def active_zone() -> engine.zone.Zone:
-    """Return the active zone."""
-    return g.world[None].components[engine.zone.Zone]
+def active_zone(world: tcod.ecs.Registry | None = None) -> engine.zone.Zone:
+    """Return the active zone of `world`, or of the global world if `world` is None."""
+    return (g.world if world is None else world)[None].components[engine.zone.Zone]
 
 
 def active_player() -> tcod.ecs.Entity:
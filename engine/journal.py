@@ -0,0 +1,141 @@
+"""Compact binary journals of player actions which can be replayed deterministically.
+
+A journal starts with a header holding the ship seed, followed by one record per player turn.  Each record is a one
+byte tag followed by the arguments of that tag.  Checksum records of the world state are written every few turns so
+that a replay can tell where it diverged from the recorded game.
+"""
+
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import attrs
+import tcod.ecs
+
+import engine.model
+import game.actions
+
+if TYPE_CHECKING:
+    from game.action import Action
+
+MAGIC = b"7DRLJRNL"
+VERSION = 1
+DEFAULT_CHECKSUM_INTERVAL = 100  # Turns between checksums.
+
+HEADER = struct.Struct("<8sHq")  # Magic, version, seed.
+CHECKSUM = struct.Struct("<I8s")  # Turn, state hash.
+DIRECTION = struct.Struct("<3b")
+
+TAG_CHECKSUM = 0
+TAG_BUMP = 1
+TAG_WAIT = 2
+TAG_PICKUP = 3
+TAG_RETURN_CONTROL = 4
+
+
+class JournalError(Exception):
+    """A journal file could not be read."""
+
+
+def encode_action(action: Action) -> bytes:
+    """Return the record for a player action.
+
+    Raises:
+        TypeError: `action` is not an action the player can take.
+    """
+    match action:
+        case game.actions.Bump(direction=direction):
+            return bytes([TAG_BUMP]) + DIRECTION.pack(*direction)
+        case game.actions.PickupGeneral():
+            return bytes([TAG_PICKUP])
+        case game.actions.ReturnControlToPlayer():
+            return bytes([TAG_RETURN_CONTROL])
+    if action is game.actions.wait:
+        return bytes([TAG_WAIT])
+    msg = f"Can not record {action!r}."
+    raise TypeError(msg)
+
+
+@attrs.define()
+class Journal:
+    """The contents of a journal file."""
+
+    seed: int
+    actions: list[Action] = attrs.Factory(list)  # The player action of each turn.
+    checksums: dict[int, str] = attrs.Factory(dict)  # State hashes from before the actions of some turns.
+
+
+def read_journal(path: Path) -> Journal:
+    """Read a journal file.  An incomplete last record, such as from a crash while recording, is ignored.
+
+    Raises:
+        JournalError: `path` is not a journal or is from an unsupported version.
+    """
+    data = path.read_bytes()
+    if len(data) < HEADER.size:
+        msg = f"{path} is too short to be a journal."
+        raise JournalError(msg)
+    magic, version, seed = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        msg = f"{path} is not a journal."
+        raise JournalError(msg)
+    if version != VERSION:
+        msg = f"{path} is journal version {version}, only version {VERSION} is supported."
+        raise JournalError(msg)
+    journal = Journal(seed)
+    simple_actions: dict[int, Action] = {
+        TAG_WAIT: game.actions.wait,
+        TAG_PICKUP: game.actions.PickupGeneral(),
+        TAG_RETURN_CONTROL: game.actions.ReturnControlToPlayer(),
+    }
+    offset = HEADER.size
+    while offset < len(data):
+        tag = data[offset]
+        offset += 1
+        if tag in simple_actions:
+            journal.actions.append(simple_actions[tag])
+        elif tag == TAG_BUMP:
+            if offset + DIRECTION.size > len(data):
+                break
+            journal.actions.append(game.actions.Bump(DIRECTION.unpack_from(data, offset)))
+            offset += DIRECTION.size
+        elif tag == TAG_CHECKSUM:
+            if offset + CHECKSUM.size > len(data):
+                break
+            turn, state_hash = CHECKSUM.unpack_from(data, offset)
+            journal.checksums[turn] = state_hash.hex()
+            offset += CHECKSUM.size
+        else:
+            msg = f"{path} has an unknown record tag {tag} at byte {offset - 1}."
+            raise JournalError(msg)
+    return journal
+
+
+class JournalWriter:
+    """Records the player actions of one game to a new journal file.
+
+    Each record is flushed as it's written, so a journal stays readable up to the last turn if the game crashes.
+    """
+
+    def __init__(self, path: Path, seed: int, checksum_interval: int = DEFAULT_CHECKSUM_INTERVAL) -> None:
+        """Create a journal at `path`, replacing any existing file.  A `checksum_interval` of 0 skips checksums."""
+        self.file = path.open("wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed))
+        self.checksum_interval = checksum_interval
+        self.turn = 0
+
+    def record(self, world: tcod.ecs.World, action: Action) -> None:
+        """Record `action` as the next player turn, this must be called before the action is performed."""
+        record = encode_action(action)
+        if self.checksum_interval and self.turn % self.checksum_interval == 0:
+            state_hash = bytes.fromhex(engine.model.get_state_hash(world))
+            record = bytes([TAG_CHECKSUM]) + CHECKSUM.pack(self.turn, state_hash) + record
+        self.file.write(record)
+        self.file.flush()
+        self.turn += 1
+
+    def close(self) -> None:
+        """Close the journal file."""
+        self.file.close()
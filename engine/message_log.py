@@ -0,0 +1,88 @@
+"""Bounded log of game messages."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+
+import attrs
+import tcod.console
+
+DEFAULT_MAX_MESSAGES = 1000
+
+
+@attrs.define(eq=False)
+class Message:
+    """A log entry which is formatted from `template` and `args` only when it's first shown.
+
+    Repeats of the same message are collapsed into this entry by increasing `count`.
+    """
+
+    template: str
+    args: dict[str, object]
+    count: int = 1
+    _text: str | None = attrs.field(default=None, init=False)
+    _heights: dict[int, int] = attrs.field(factory=dict, init=False)  # Wrapped heights keyed by width.
+
+    @property
+    def text(self) -> str:
+        """The formatted text of this message, including the repeat count."""
+        if self._text is None:
+            self._text = self.template.format(**self.args)
+            if self.count > 1:
+                self._text += f" x{self.count}"
+        return self._text
+
+    def get_height(self, width: int) -> int:
+        """Return the number of lines this message takes when wrapped to `width`."""
+        height = self._heights.get(width)
+        if height is None:
+            height = self._heights[width] = tcod.console.get_height_rect(width, self.text)
+        return height
+
+    def repeat(self) -> None:
+        """Count another repeat of this message."""
+        self.count += 1
+        self._text = None
+        self._heights.clear()
+
+
+class MessageLog:
+    """A ring buffer of the most recent `max_messages` messages.
+
+    `version` changes whenever a message is added or repeated, which can be used to tell when the log needs redrawing.
+    """
+
+    def __init__(self, max_messages: int = DEFAULT_MAX_MESSAGES) -> None:
+        """Initialize an empty log."""
+        self.messages: deque[Message] = deque(maxlen=max_messages)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self.messages)
+
+    def __reversed__(self) -> Iterator[Message]:
+        return reversed(self.messages)
+
+    def add(self, template: str, **args: object) -> None:
+        """Add a message formatted from `template` and `args`, repeats of the newest message are collapsed into it."""
+        self.version += 1
+        if self.messages and self.messages[-1].template == template and self.messages[-1].args == args:
+            self.messages[-1].repeat()
+            return
+        self.messages.append(Message(template, args))
+
+    def render(self, console: tcod.console.Console) -> None:
+        """Draw the newest messages onto `console`, aligned to its bottom edge.
+
+        Only the messages which fit on `console` are formatted and measured.
+        """
+        y = console.height
+        for message in reversed(self.messages):
+            y -= message.get_height(console.width)
+            if y < 0:
+                break
+            console.print_box(0, y, 0, 0, message.text)
@@ -1,16 +1,62 @@
 from __future__ import annotations
 
+import hashlib
+from pathlib import Path
+
 import tcod.ecs
 
-import engine.zone
 import g
-import procgen.shipgen
+import procgen.shipcache
+from component.actor import Actor
+from component.graphic import Graphic
+from component.item import Item
+from component.location import Location
+from component.physicality import Physicality
+from engine.helpers import active_zone
+from engine.message_log import MessageLog
+
+SHIP_CACHE_PATH = Path(".cache", "ships")
 
 
-def init() -> None:
+def init(seed: int = 1) -> None:
     g.world = tcod.ecs.World()
-    g.world[None].components[("log", list[str])] = []
+    g.world[None].components[MessageLog] = MessageLog()
+    g.world[None].components[("seed", int)] = seed
+
+    layout = procgen.shipcache.ShipCache(SHIP_CACHE_PATH).load_or_generate(seed)
+    player = layout.materialize(g.world)
+    g.world[None].components[("player", tcod.ecs.Entity)] = player
+
+
+def _describe_entity(entity: tcod.ecs.Entity) -> str:
+    """Return the simulated state of `entity` as a string which doesn't depend on its identity."""
+    location = entity.components.get(Location)
+    graphic = entity.components.get(Graphic)
+    physicality = entity.components.get(Physicality)
+    actor = entity.components.get(Actor)
+    item = entity.components.get(Item)
+    return repr(
+        (
+            location.xyz if location else None,
+            (graphic.ch, graphic.fg) if graphic else None,
+            (physicality.name, physicality.blocking) if physicality else None,
+            (actor.controlled, actor.ticket.time if actor.ticket else None, actor.sleeping_room) if actor else None,
+            item.name if item else None,
+            sorted(entity.tags),
+        ),
+    )
+
+
+def get_state_hash(world: tcod.ecs.World) -> str:
+    """Return a hash of the simulation state of `world`.
 
-    ship = procgen.shipgen.Ship(1)
-    g.world[None].components[engine.zone.Zone] = ship.zone
-    g.world[None].components[("player", tcod.ecs.Entity)] = ship.player
+    Worlds built from the same seed and given the same inputs hash the same.
+    """
+    zone = active_zone(world)
+    digest = hashlib.sha256()
+    digest.update(repr((zone.tqueue.time, zone.camera, len(world[None].components[MessageLog]))).encode())
+    digest.update(zone.cells[...].tobytes())
+    entities = world.Q.any_of(components=[Location, Actor, Item])
+    for description in sorted(_describe_entity(entity) for entity in entities):
+        digest.update(description.encode())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,286 @@
+"""Hierarchical pathfinding over the rooms and doors of a zone."""
+
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import scipy.ndimage  # type: ignore[import-untyped]
+import scipy.sparse  # type: ignore[import-untyped]
+import scipy.sparse.csgraph  # type: ignore[import-untyped]
+import tcod.path
+from numpy.typing import NDArray
+
+from engine.flow_field import CARDINAL_COST, DIAGONAL_COST
+
+if TYPE_CHECKING:
+    import engine.zone
+
+MAX_CACHED_PATHS = 1024
+# Connects cells to their 8 neighbors on the same level.
+LEVEL_STRUCTURE = np.zeros((3, 3, 3), dtype=bool)
+LEVEL_STRUCTURE[:, :, 1] = True
+
+
+def octile_distance(a: NDArray[np.intp], b: NDArray[np.intp]) -> NDArray[np.intp]:
+    """Return the costs of the shortest unobstructed 8-way paths between the `(x, y)` points of `a` and `b`.
+
+    Uses the same step costs as `engine.flow_field`.  Integer costs keep equally short routes exactly tied.
+    """
+    delta = np.abs(a - b)
+    longest = np.max(delta, axis=-1)
+    shortest = np.min(delta, axis=-1)
+    distance: NDArray[np.intp] = (longest - shortest) * CARDINAL_COST + shortest * DIAGONAL_COST
+    return distance
+
+
+class RoomPathfinder:
+    """Finds paths by planning a route of doors over the room graph and then refining it within each room.
+
+    Rooms are split into areas of connected walkable cells since a room id such as the corridors can cover many
+    separate parts of a ship.  Areas are only joined by open doors.
+
+    Each area is searched only within its own bounding box, so long paths across a ship avoid searching the whole
+    zone.  Routes are planned with straight line distances between doors, so they are not always the shortest.
+
+    Like `engine.flow_field.FlowField` this uses `Zone.static_cost`: closed doors block and actors are ignored.
+    Everything cached, including the found paths, is discarded when `Zone.static_cost_version` changes.
+
+    `areas` is a dense array covering the whole zone, even for zones with chunked cells.  It uses the smallest unsigned
+    integer type which holds every area, usually 2 bytes per cell.
+    """
+
+    def __init__(self, zone: engine.zone.Zone) -> None:
+        """Initialize a pathfinder for `zone`."""
+        self.zone = zone
+        self.version = -1
+        self.areas: NDArray[np.unsignedinteger[Any]] = np.zeros((0, 0, 0), dtype=np.uint8)  # Area of each cell or 0.
+        self.area_bounds: list[Any] = []  # The bounding box of each area, area N is at index N - 1.
+        self.door_areas: dict[tuple[int, int, int], list[int]] = {}  # The areas each open door joins.
+        self.area_doors: dict[int, list[tuple[int, int, int]]] = {}  # The open doors of each area.
+        self.doors: list[tuple[int, int, int]] = []  # Open doors in a fixed order, the nodes of `get_route`.
+        self.door_positions: NDArray[np.intp] = np.zeros((0, 2), dtype=np.intp)
+        self.area_door_indexes: dict[int, NDArray[np.intp]] = {}  # Indexes into `doors` for each area.
+        # Straight line distances between every pair of open doors sharing an area, indexed like `doors`.
+        self.graph = scipy.sparse.csr_array((0, 0), dtype=np.intp)
+        # Joins each pair of areas sharing an open door, indexed by area.
+        self.area_graph = scipy.sparse.csr_array((1, 1), dtype=np.intp)
+        self.hops_from: tuple[int, ...] | None = None  # The areas `hops` was last computed from.
+        self.hops: NDArray[np.float64] = np.zeros(1)
+        self.area_pathfinders: dict[int, tcod.path.AStar] = {}
+        self.paths: dict[tuple[tuple[int, int, int], tuple[int, int, int]], list[tuple[int, int, int]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def update(self) -> None:
+        """Rebuild the room graph if the zone costs have changed since it was built."""
+        static_cost = self.zone.static_cost  # Builds the costs and updates the version if needed.
+        if self.version == self.zone.static_cost_version:
+            return
+        self.version = self.zone.static_cost_version
+        open_doors = {door for room in self.zone.rooms.values() for door in room.doors if static_cost[door]}
+        walkable = static_cost != 0
+        for door in open_doors:
+            walkable[door] = False  # Doors are the edges between areas.
+        parts, _ = scipy.ndimage.label(walkable, LEVEL_STRUCTURE)
+        # Split the connected parts further by room.
+        room_ids = self.zone.cells["room_id"][...].astype(np.intp)
+        keys = np.where(walkable, parts * (room_ids.max() + 2) + room_ids + 1, 0)
+        _, inverse = np.unique(keys, return_inverse=True)
+        # Unwalkable cells are key 0, so they're area 0.
+        self.areas = inverse.reshape(keys.shape).astype(np.min_scalar_type(inverse.max(initial=0)))
+        self.area_bounds = scipy.ndimage.find_objects(self.areas)
+
+        self.doors = sorted(open_doors)
+        self.door_positions = np.array([door[:2] for door in self.doors], dtype=np.intp).reshape(-1, 2)
+        self.door_areas = {}
+        self.area_doors = {}
+        area_door_indexes: dict[int, list[int]] = {}
+        for i, (x, y, z) in enumerate(self.doors):
+            neighbors = ((x - 1, y, z), (x + 1, y, z), (x, y - 1, z), (x, y + 1, z))
+            door_areas = {
+                int(self.areas[xyz])
+                for xyz in neighbors
+                if 0 <= xyz[0] < self.zone.width and 0 <= xyz[1] < self.zone.height and self.areas[xyz]
+            }
+            self.door_areas[x, y, z] = sorted(door_areas)
+            for area in door_areas:
+                self.area_doors.setdefault(area, []).append((x, y, z))
+                area_door_indexes.setdefault(area, []).append(i)
+        self.area_door_indexes = {area: np.array(indexes, dtype=np.intp) for area, indexes in area_door_indexes.items()}
+        self.graph = self._get_door_graph()
+        self.area_graph = self._get_area_graph()
+        self.hops_from = None
+        self.area_pathfinders = {}
+        self.paths = {}
+
+    def get_areas(self, xyz: tuple[int, int, int]) -> list[int]:
+        """Return the areas which `xyz` can be reached from."""
+        areas = self.door_areas.get(xyz)
+        if areas is not None:
+            return areas
+        area = int(self.areas[xyz])
+        return [area] if area else []
+
+    def get_area_region(self, area: int) -> tuple[slice, slice, slice]:
+        """Return the bounding box of an area grown to include the doors on its edges."""
+        x, y, z = self.area_bounds[area - 1]
+        return (
+            slice(max(0, x.start - 1), min(self.zone.width, x.stop + 1)),
+            slice(max(0, y.start - 1), min(self.zone.height, y.stop + 1)),
+            z,
+        )
+
+    def get_area_pathfinder(self, area: int) -> tcod.path.AStar:
+        """Return a pathfinder over `get_area_region` which only walks within an area and onto its doors."""
+        pathfinder = self.area_pathfinders.get(area)
+        if pathfinder is None:
+            x, y, z = self.get_area_region(area)
+            cost = (self.areas[x, y, z.start] == area).astype(np.int8)
+            for door_x, door_y, _ in self.area_doors.get(area, ()):
+                cost[door_x - x.start, door_y - y.start] = 1
+            pathfinder = self.area_pathfinders[area] = tcod.path.AStar(cost)
+        return pathfinder
+
+    def get_area_path(
+        self,
+        area: int,
+        start: tuple[int, int, int],
+        goal: tuple[int, int, int],
+    ) -> list[tuple[int, int, int]]:
+        """Return the path from `start` to `goal` within an area, or an empty list if there isn't one."""
+        pathfinder = self.get_area_pathfinder(area)
+        x, y, z = self.get_area_region(area)
+        path = pathfinder.get_path(start[0] - x.start, start[1] - y.start, goal[0] - x.start, goal[1] - y.start)
+        return [(path_x + x.start, path_y + y.start, z.start) for path_x, path_y in path]
+
+    def get_area_door_indexes(self, areas: list[int]) -> NDArray[np.intp]:
+        """Return the sorted indexes into `doors` of the doors of `areas`."""
+        no_doors = np.zeros(0, dtype=np.intp)
+        return np.unique(np.concatenate([no_doors, *(self.area_door_indexes.get(area, no_doors) for area in areas)]))
+
+    def _get_door_graph(self) -> scipy.sparse.csr_array:
+        """Return a sparse graph joining each door to the other doors of its areas."""
+        edges_from = [np.zeros(0, dtype=np.intp)]
+        edges_to = [np.zeros(0, dtype=np.intp)]
+        for indexes in self.area_door_indexes.values():
+            from_grid, to_grid = np.meshgrid(indexes, indexes, indexing="ij")
+            edges_from.append(from_grid.ravel())
+            edges_to.append(to_grid.ravel())
+        rows = np.concatenate(edges_from)
+        columns = np.concatenate(edges_to)
+        graph = scipy.sparse.csr_array(
+            (np.ones_like(rows), (rows, columns)),
+            shape=(len(self.doors), len(self.doors)),
+            dtype=np.intp,
+        )
+        graph.sum_duplicates()  # Doors sharing more than one area have their edges listed more than once.
+        rows = np.repeat(np.arange(len(self.doors)), np.diff(graph.indptr))
+        graph.data = octile_distance(self.door_positions[rows], self.door_positions[graph.indices])
+        graph.eliminate_zeros()  # Each door to itself.
+        return graph
+
+    def _get_area_graph(self) -> scipy.sparse.csr_array:
+        """Return a sparse graph joining each pair of areas which share an open door."""
+        pairs = [(a, b) for areas in self.door_areas.values() for a in areas for b in areas if a != b]
+        rows = np.array([a for a, _ in pairs], dtype=np.intp)
+        columns = np.array([b for _, b in pairs], dtype=np.intp)
+        shape = (len(self.area_bounds) + 1, len(self.area_bounds) + 1)
+        return scipy.sparse.csr_array((np.ones_like(rows), (rows, columns)), shape=shape)
+
+    def get_hops(self, xyz: tuple[int, int, int]) -> NDArray[np.float64]:
+        """Return the fewest doors crossed to go from `xyz` to each area, indexed by area and inf if unreachable.
+
+        The result is reused until `xyz` moves to another area or the graph is rebuilt.
+        """
+        self.update()
+        areas = tuple(self.get_areas(xyz))
+        if areas != self.hops_from:
+            self.hops_from = areas
+            if areas:
+                hops = scipy.sparse.csgraph.shortest_path(self.area_graph, unweighted=True, indices=areas)
+                self.hops = hops.min(axis=0)
+            else:
+                self.hops = np.full(self.area_graph.shape[0], np.inf)
+        return self.hops
+
+    def get_route(
+        self,
+        start: tuple[int, int, int],
+        goal: tuple[int, int, int],
+    ) -> list[tuple[int, tuple[int, int, int]]] | None:
+        """Return the `(area, door)` hops from `start` to `goal` with the last hop ending at `goal`.
+
+        This is a Dijkstra search over the door graph where each area is crossed in a straight line.
+        """
+        start_areas = self.get_areas(start)
+        goal_areas = self.get_areas(goal)
+        if not start_areas or not goal_areas:
+            return None
+        # The graph is extended with `start` as an extra node which leads to the doors of its areas.
+        start_node = len(self.doors)
+        start_doors = self.get_area_door_indexes(start_areas)
+        start_costs = octile_distance(self.door_positions[start_doors], np.array(start[:2]))
+        start_doors = start_doors[start_costs > 0]
+        start_costs = start_costs[start_costs > 0]
+        graph = scipy.sparse.csr_array(
+            (
+                np.concatenate([self.graph.data, start_costs]),
+                np.concatenate([self.graph.indices, start_doors]),
+                np.append(self.graph.indptr, self.graph.indptr[-1] + len(start_doors)),
+            ),
+            shape=(start_node + 1, start_node + 1),
+        )
+        distances, predecessors = scipy.sparse.csgraph.dijkstra(graph, indices=start_node, return_predecessors=True)
+        # Finish from whichever door of the goal's areas gives the shortest total.
+        goal_doors = self.get_area_door_indexes(goal_areas)
+        totals = distances[goal_doors] + octile_distance(self.door_positions[goal_doors], np.array(goal[:2]))
+        if not len(totals) or not np.isfinite(totals.min()):
+            return None
+        nodes = [int(goal_doors[np.argmin(totals)])]
+        while nodes[-1] != start_node:
+            nodes.append(int(predecessors[nodes[-1]]))
+        nodes.reverse()
+        positions = [start, *(self.doors[node] for node in nodes[1:]), goal]
+        route = []
+        for position, next_position in itertools.pairwise(positions):
+            area = next(area for area in self.get_areas(position) if area in self.get_areas(next_position))
+            route.append((area, next_position))
+        return route
+
+    def get_path(self, start: tuple[int, int, int], goal: tuple[int, int, int]) -> list[tuple[int, int, int]]:
+        """Return a path from `start` to `goal` not including `start`, or an empty list if there isn't one."""
+        self.update()
+        key = start, goal
+        path = self.paths.get(key)
+        if path is not None:
+            self.hits += 1
+            return list(path)
+        self.misses += 1
+        path = self.compute_path(start, goal)
+        if len(self.paths) >= MAX_CACHED_PATHS:
+            del self.paths[next(iter(self.paths))]  # Forget the oldest path.
+        self.paths[key] = path
+        return list(path)
+
+    def compute_path(self, start: tuple[int, int, int], goal: tuple[int, int, int]) -> list[tuple[int, int, int]]:
+        """Compute a path from `start` to `goal` without using the cache, `update` must be called first."""
+        if start == goal or start[2] != goal[2]:
+            return []
+        for area in set(self.get_areas(start)) & set(self.get_areas(goal)):
+            path = self.get_area_path(area, start, goal)
+            if path:
+                return path
+        route = self.get_route(start, goal)
+        if route is None:
+            return []
+        path = []
+        position = start
+        for area, next_position in route:
+            segment = self.get_area_path(area, position, next_position)
+            if not segment:
+                return []  # Shouldn't happen since areas are connected.
+            path += segment
+            position = next_position
+        return path
@@ -0,0 +1,122 @@
+"""Turn scheduling for the actors of a zone."""
+
+from __future__ import annotations
+
+import heapq
+from collections import deque
+from collections.abc import Iterable
+from typing import Generic, TypeVar
+
+import attrs
+
+T = TypeVar("T")
+
+COMPACT_MIN_STALE = 1024  # Cancelled tickets are never purged while there are fewer than this many.
+
+
+@attrs.define(eq=False)
+class Ticket(Generic[T]):
+    """A turn for `value` at `time`.  Tickets compare by identity."""
+
+    time: int
+    value: T
+    scheduled: bool = True  # False once this ticket has been popped or cancelled.
+
+
+class TurnQueue(Generic[T]):
+    """A queue of tickets popped in order of time, tickets for the same time are popped in the order they were scheduled.
+
+    Tickets are kept in a bucket for each time with a binary heap of those times.  Actors mostly wait fixed intervals
+    such as 100 or 150, so there are far fewer times than tickets and most schedules only append to an existing bucket.
+    Tickets with unique times still work, the heap of times then holds one time per ticket.
+
+    Cancelled tickets are left in their buckets and skipped once popped, which makes `cancel` O(1).  The buckets are
+    compacted once the cancelled tickets outnumber the scheduled ones.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty queue at time 0."""
+        self.time = 0  # The time of the last popped ticket.
+        self.times: list[int] = []  # A heap of the times in `buckets`.
+        self.buckets: dict[int, deque[Ticket[T]]] = {}
+        self.scheduled = 0  # The number of tickets which will be popped.
+        self.stale = 0  # The number of cancelled tickets still in `buckets`.
+
+    def __len__(self) -> int:
+        """Return the number of scheduled tickets, not counting cancelled tickets."""
+        return self.scheduled
+
+    def _get_bucket(self, time: int) -> deque[Ticket[T]]:
+        """Return the bucket for `time`, adding it if it doesn't exist."""
+        bucket = self.buckets.get(time)
+        if bucket is None:
+            bucket = self.buckets[time] = deque()
+            heapq.heappush(self.times, time)
+        return bucket
+
+    def schedule(self, interval: int, value: T) -> Ticket[T]:
+        """Schedule `value` to be popped `interval` after the current time and return its ticket."""
+        if interval < 0:
+            msg = f"Can not schedule into the past (interval={interval})."
+            raise ValueError(msg)
+        ticket = Ticket(self.time + interval, value)
+        self._get_bucket(ticket.time).append(ticket)
+        self.scheduled += 1
+        return ticket
+
+    def schedule_many(self, interval: int, values: Iterable[T]) -> list[Ticket[T]]:
+        """Schedule all of `values` for the same time, in order, and return their tickets.
+
+        This only looks up the bucket for the time once.
+        """
+        if interval < 0:
+            msg = f"Can not schedule into the past (interval={interval})."
+            raise ValueError(msg)
+        time = self.time + interval
+        tickets = [Ticket(time, value) for value in values]
+        if tickets:
+            self._get_bucket(time).extend(tickets)
+            self.scheduled += len(tickets)
+        return tickets
+
+    def cancel(self, ticket: Ticket[T]) -> None:
+        """Cancel `ticket` so that it will not be popped.  Does nothing if the ticket was already popped or cancelled."""
+        if not ticket.scheduled:
+            return
+        ticket.scheduled = False
+        self.scheduled -= 1
+        self.stale += 1
+        if self.stale >= COMPACT_MIN_STALE and self.stale > self.scheduled:
+            self.compact()
+
+    def pop(self) -> Ticket[T]:
+        """Remove and return the next ticket, advancing `time` to that ticket's time.
+
+        Raises:
+            IndexError: There are no scheduled tickets.
+        """
+        while self.times:
+            time = self.times[0]
+            bucket = self.buckets[time]
+            while bucket:
+                ticket = bucket.popleft()
+                if ticket.scheduled:
+                    ticket.scheduled = False
+                    self.scheduled -= 1
+                    self.time = time
+                    return ticket
+                self.stale -= 1
+            del self.buckets[time]
+            heapq.heappop(self.times)
+        msg = "pop from an empty TurnQueue"
+        raise IndexError(msg)
+
+    def compact(self) -> None:
+        """Remove all cancelled tickets and empty buckets."""
+        self.buckets = {
+            time: deque(ticket for ticket in bucket if ticket.scheduled) for time, bucket in self.buckets.items()
+        }
+        self.buckets = {time: bucket for time, bucket in self.buckets.items() if bucket}
+        self.times = list(self.buckets)
+        heapq.heapify(self.times)
+        self.stale = 0
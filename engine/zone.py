@@ -1,39 +1,195 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Final
+import weakref
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING, Any, Final, Literal, overload
 
+import attrs
 import numpy as np
+import scipy.ndimage  # type: ignore[import-untyped]
 import tcod.console
 import tcod.ecs
+from numpy.typing import NDArray
 
 import component.actor
 import component.location
-import g
+import component.physicality
 import tiles
 from component.graphic import Graphic
+from engine.chunked import ChunkedArray
+from engine.flow_field import FlowField
 from engine.helpers import active_player
-from tqueue import tqueue
+from engine.room_graph import RoomPathfinder
+from engine.turn_queue import TurnQueue
 
 if TYPE_CHECKING:
     import procgen.shipgen
 
+FULL_DETAIL_HOPS = 2  # Actors within this many doors of the camera take one turn at a time.
+COARSE_TURNS = 4  # The turns taken at once by actors further away.
+
+
+@attrs.define
+class Room:
+    """Cached information about a room in a zone."""
+
+    room_id: int
+    bounds: tuple[slice, slice, slice]  # The bounding box of this room.
+    walkable_count: int
+    doors: list[tuple[int, int, int]] = attrs.field(factory=list)
+
+    @property
+    def origin(self) -> tuple[int, int, int]:
+        """The upper-left corner of this rooms bounding box."""
+        x, y, z = self.bounds
+        return x.start, y.start, z.start
+
+
+def index_bounds(key: Any, shape: tuple[int, int, int]) -> tuple[slice, slice, slice]:  # noqa: ANN401
+    """Return the bounding box of the cells selected by a NumPy index into an array of `shape`."""
+    if not isinstance(key, tuple):
+        key = (key,)
+    if any(index is Ellipsis for index in key):
+        i = key.index(Ellipsis)
+        key = key[:i] + (slice(None),) * (len(shape) - len(key) + 1) + key[i + 1 :]
+    key = key + (slice(None),) * (len(shape) - len(key))
+    bounds = []
+    for index, size in zip(key, shape, strict=True):
+        if isinstance(index, slice):
+            selected = range(*index.indices(size))
+            bounds.append(slice(min(selected), max(selected) + 1) if selected else slice(0, 0))
+            continue
+        indexes = np.asarray(index) % size  # Wrap negative indexes.
+        bounds.append(slice(int(indexes.min()), int(indexes.max()) + 1) if indexes.size else slice(0, 0))
+    x, y, z = bounds
+    return x, y, z
+
+
+class TileView:
+    """A view of the tiles of a zone which acts like an array of `tiles.DTYPE`.
+
+    Reads are gathered from the palette and writes add new tiles to the palette.
+    """
+
+    def __init__(self, zone: Zone) -> None:
+        self.zone = zone
+
+    def __getitem__(self, key: Any) -> NDArray[Any]:  # noqa: ANN401
+        """Return a field of all tiles or the tiles at an index."""
+        if isinstance(key, str):
+            return self.zone.palette[key][self.zone.cells["tile"][...]]  # type: ignore[no-any-return]
+        return self.zone.palette[self.zone.cells["tile"][key]]  # type: ignore[no-any-return]
+
+    def __setitem__(self, key: Any, tile: tiles.Tile) -> None:  # noqa: ANN401
+        """Set the tiles at an index."""
+        self.zone.set_tile_indexes(key, self.zone.get_tile_index(tile))
+
+
+class ZoneData:
+    """A view of the cells of a zone which acts like an array of `Zone.DTYPE`.
+
+    Indexing a position returns a copy of the data at that position.
+    """
+
+    def __init__(self, zone: Zone) -> None:
+        self.zone = zone
+
+    @overload
+    def __getitem__(self, key: Literal["tile"]) -> TileView: ...
+    @overload
+    def __getitem__(self, key: Literal["room_id"]) -> NDArray[np.int16]: ...
+    @overload
+    def __getitem__(self, key: Any) -> NDArray[Any]: ...  # noqa: ANN401
+
+    def __getitem__(self, key: Any) -> TileView | NDArray[Any]:
+        """Return a field view or a copy of the cells at an index."""
+        if isinstance(key, str):
+            return TileView(self.zone) if key == "tile" else self.zone.cells[key]
+        cells = self.zone.cells[key]
+        result = np.empty(cells.shape, dtype=Zone.DTYPE)
+        result["tile"] = self.zone.palette[cells["tile"]]
+        result["room_id"] = cells["room_id"]
+        return result[()]
+
+    def __setitem__(self, key: Literal["tile", "room_id"], value: Any) -> None:  # noqa: ANN401
+        """Fill a field of all cells."""
+        if key == "tile":
+            self.zone.set_tile_indexes(..., self.zone.get_tile_index(value))
+        else:
+            self.zone.cells["room_id"] = value
+
 
 class Zone:
     DTYPE: Final = [("tile", tiles.DTYPE), ("room_id", np.int16)]
-    locations: dict[tuple[int, int, int], component.location.Location]
+    CELL_DTYPE: Final = [("tile", np.uint8), ("room_id", np.int16)]
+    WIDE_CELL_DTYPE: Final = [("tile", np.uint16), ("room_id", np.int16)]
+    # Interned locations, these are removed once they're no longer referenced.
+    locations: weakref.WeakValueDictionary[tuple[int, int, int], component.location.Location]
     room_types: dict[int, procgen.shipgen.RoomType]
+    rooms: dict[int, Room]
+    door_rooms: dict[tuple[int, int, int], list[int]]  # The ids of the rooms of each door, see `index_rooms`.
+    entity_index: dict[tuple[int, int, int], list[tcod.ecs.Entity]]  # Entities at each position, see `entities_at`.
+    # Tiles are stored as indexes into `palette`, `tile_indexes` maps each palette tile back to its index.
+    cells: NDArray[Any] | ChunkedArray
+    palette: NDArray[Any]
+    tile_indexes: dict[tiles.Tile, int]
+    # Movement costs derived from the tiles and blocking entities, built on first use of `cost` or `static_cost`.
+    _cost: NDArray[np.int8] | None
+    _static_cost: NDArray[np.int8] | None
+    # Cells of `static_cost` changed since `static_cost_version` was last read, with their values at that version.
+    _static_cost_pending: dict[tuple[int, int, int], int]
 
-    def __init__(self, shape: tuple[int, int, int]) -> None:
+    def __init__(
+        self,
+        shape: tuple[int, int, int],
+        chunk_shape: tuple[int, int, int] | None = None,
+        *,
+        cells: NDArray[Any] | ChunkedArray | None = None,
+    ) -> None:
+        """Initialize a zone of floor surrounded by walls.
+
+        If `chunk_shape` is given then cells are stored in a `ChunkedArray` with chunks of that shape.
+        Only `cells` is chunked: `cost`, `static_cost`, `room_paths.areas` and the pre-rendered static layers are
+        still dense arrays over the whole zone once they're used.
+        If `cells` is given then the zone uses those cells without copying or filling them, `shape` must match them
+        and their tile indexes must match the palette given to `set_palette` afterwards.
+        """
         self.shape = shape
 
         self.camera: tuple[int, int, int] = (0, 0, 0)
+        # Pre-rendered tiles for each z level and the regions which changed since they were rendered.
+        self.static_layers: dict[int, tcod.console.Console] = {}
+        self.dirty_regions: list[tuple[slice, slice, slice]] = []
+        self._cost = None
+        self._static_cost = None
+        self._static_cost_version = 0
+        self._static_cost_pending = {}
+        self.chase_field = FlowField(self)
+        self.room_paths = RoomPathfinder(self)
 
-        self.data = np.empty(shape, dtype=self.DTYPE, order="F")
-        self.data["tile"] = tiles.metal_wall
-        self.data["tile"][1:-1, 1:-1, :] = tiles.metal_floor
+        if cells is not None:
+            assert cells.shape == shape, f"{cells.shape=} does not match {shape=}"
+            self.cells = cells
+            self.set_palette([tiles.metal_wall, tiles.metal_floor])
+        else:
+            if chunk_shape is None:
+                self.cells = np.zeros(shape, dtype=self.CELL_DTYPE, order="F")
+            else:
+                self.cells = ChunkedArray(shape, self.CELL_DTYPE, chunk_shape)
+            self.set_palette([tiles.metal_wall, tiles.metal_floor])
+            self.clear(tiles.metal_floor)
+            wall = self.get_tile_index(tiles.metal_wall)
+            self.cells["tile"][0, :, :] = wall
+            self.cells["tile"][-1, :, :] = wall
+            self.cells["tile"][:, 0, :] = wall
+            self.cells["tile"][:, -1, :] = wall
 
-        self.locations = {}
-        self.tqueue: tqueue.TurnQueue[tcod.ecs.Entity] = tqueue.TurnQueue()
+        self.locations = weakref.WeakValueDictionary()
+        self.entity_index = {}
+        self.rooms = {}
+        self.door_rooms = {}
+        self.tqueue: TurnQueue[tcod.ecs.Entity] = TurnQueue()
+        self.sleepers: dict[int, dict[tcod.ecs.Entity, None]] = {}  # Sleeping actors by room, in order of sleeping.
 
         self.player: tcod.ecs.Entity | None = None
 
@@ -46,6 +202,23 @@ def simulate(self) -> None:
                 raise SystemExit(msg)
         self.player.components[component.actor.Actor].action = None  # Clear PlayerControl action.
 
+    def get_detail_turns(self, xyz: tuple[int, int, int]) -> int:
+        """Return how many turns an actor at `xyz` should take each time it's called.
+
+        Actors more than `FULL_DETAIL_HOPS` doors away from the camera, or with no route to it, take `COARSE_TURNS`
+        turns at once and are scheduled less often.
+        """
+        hops = self.room_paths.get_hops(self.camera)
+        areas = self.room_paths.get_areas(xyz)
+        if areas and min(hops[area] for area in areas) <= FULL_DETAIL_HOPS:
+            return 1
+        return COARSE_TURNS
+
+    def wake_room(self, room_id: int) -> None:
+        """Wake all actors sleeping in `room_id`."""
+        for entity in list(self.sleepers.get(room_id, ())):
+            component.actor.Actor.wake(entity)
+
     def render(self, console: tcod.console.Console) -> None:
         console.clear()
         cam_x, cam_y, cam_z = self.camera
@@ -57,29 +230,269 @@ def render(self, console: tcod.console.Console) -> None:
         cam_right = min(cam_x + console.width, self.width)
         cam_bottom = min(cam_y + console.height, self.height)
 
-        con_view = (slice(cam_left - cam_x, cam_right - cam_x), slice(cam_top - cam_y, cam_bottom - cam_y))
+        if cam_left < cam_right and cam_top < cam_bottom:
+            self.get_static_layer(cam_z).blit(
+                console,
+                dest_x=cam_left - cam_x,
+                dest_y=cam_top - cam_y,
+                src_x=cam_left,
+                src_y=cam_top,
+                width=cam_right - cam_left,
+                height=cam_bottom - cam_top,
+            )
+
+        self.render_entities(console, cam_x, cam_y, cam_z)
+
+    def render_entities(self, console: tcod.console.Console, cam_x: int, cam_y: int, cam_z: int) -> None:
+        """Draw the visible entities with a `Graphic` onto `console`, higher priority graphics are drawn on top."""
+        entities = self.entities_in_rect(
+            cam_x,
+            cam_y,
+            cam_x + console.width,
+            cam_y + console.height,
+            cam_z,
+            components=[Graphic],
+        )
+        if not entities:
+            return
+        graphics = [entity.components[Graphic] for entity in entities]
+        locations = [entity.components[component.location.Location] for entity in entities]
+        order = np.argsort([graphic.priority for graphic in graphics], kind="stable")
+        x = np.array([location.x for location in locations])[order] - cam_x
+        y = np.array([location.y for location in locations])[order] - cam_y
+        ch = np.array([graphic.ch for graphic in graphics])[order]
+        fg = np.array([graphic.fg for graphic in graphics], dtype=np.uint8)[order]
+        # Keep only the last (highest priority) graphic at each position.
+        _, last = np.unique((x * console.height + y)[::-1], return_index=True)
+        top = len(order) - 1 - last
+        console.ch[x[top], y[top]] = ch[top]
+        console.fg[x[top], y[top]] = fg[top]
+
+    def get_static_layer(self, z: int) -> tcod.console.Console:
+        """Return the pre-rendered tiles of level `z`, updating any dirty regions first."""
+        for x, y, dirty_z in self.dirty_regions:
+            for layer_z in range(*dirty_z.indices(self.depth)):
+                if layer_z in self.static_layers:
+                    self.render_tiles(self.static_layers[layer_z], x, y, layer_z)
+        self.dirty_regions.clear()
+        if z not in self.static_layers:
+            self.static_layers[z] = tcod.console.Console(self.width, self.height, order="F")
+            self.render_tiles(self.static_layers[z], slice(None), slice(None), z)
+        return self.static_layers[z]
+
+    def render_tiles(self, console: tcod.console.Console, x: slice, y: slice, z: int) -> None:
+        """Render the tiles of a region of this zone onto the same region of `console`."""
+        tile = self.palette[self.cells["tile"][x, y, z]]
+        console.ch[x, y] = tile["ch"]
+        console.fg[x, y] = tile["fg"]
+        console.bg[x, y] = tile["bg"]
+
+    def set_tile_indexes(self, key: Any, value: Any) -> None:  # noqa: ANN401
+        """Assign palette indexes to the tiles at `key` and mark them as needing to be rendered again."""
+        self.cells["tile"][key] = value
+        self.dirty_regions.append(index_bounds(key, self.shape))
+        self.update_cost(key)
+
+    def invalidate_static_layers(self) -> None:
+        """Discard all pre-rendered tiles."""
+        self.static_layers.clear()
+        self.dirty_regions.clear()
+
+    @property
+    def cost(self) -> NDArray[np.int8]:
+        """The movement cost of each cell, 1 where walkable and 0 where blocked by a tile or a blocking entity.
+
+        This is kept up to date as tiles change and as blocking entities move, so views of it such as
+        `cost[:, :, z]` can be given to `tcod.path` once and reused.
+        """
+        if self._cost is None:
+            self.build_costs()
+            assert self._cost is not None
+        return self._cost
+
+    @property
+    def static_cost(self) -> NDArray[np.int8]:
+        """Like `cost` but only blocked by tiles and by blocking entities which aren't actors, such as closed doors.
+
+        This changes much less often than `cost` does, `static_cost_version` is changed whenever it does.
+        """
+        if self._static_cost is None:
+            self.build_costs()
+            assert self._static_cost is not None
+        return self._static_cost
+
+    @property
+    def static_cost_version(self) -> int:
+        """A number which is changed whenever `static_cost` changes.
+
+        Single cell changes are only counted if they haven't been undone by the time this is read.  Spawning an actor
+        adds its blocking `Physicality` before its `Actor`, which blocks and then unblocks its cell in `static_cost`.
+        """
+        if self._static_cost_pending:
+            assert self._static_cost is not None
+            if any(self._static_cost[xyz] != old for xyz, old in self._static_cost_pending.items()):
+                self._static_cost_version += 1
+            self._static_cost_pending.clear()
+        return self._static_cost_version
+
+    def build_costs(self) -> None:
+        """Build `cost` and `static_cost` from scratch."""
+        self._cost = np.zeros(self.shape, dtype=np.int8, order="F")
+        self._static_cost = np.zeros(self.shape, dtype=np.int8, order="F")
+        self._static_cost_pending.clear()
+        self.update_cost(...)
+        self._static_cost_version += 1
+
+    def update_cost(self, key: Any) -> None:  # noqa: ANN401
+        """Recompute `cost` and `static_cost` in the region of `key` from the tiles and the blocking entities there."""
+        if self._cost is None or self._static_cost is None:
+            return  # Built in full once they're used.
+        x, y, z = index_bounds(key, self.shape)
+        static_cost = self.palette["walkable"][self.cells["tile"][x, y, z]].astype(np.int8)
+        cost = static_cost.copy()
+        for layer_z in range(*z.indices(self.depth)):
+            for entity in self.entities_in_rect(
+                x.start,
+                y.start,
+                x.stop,
+                y.stop,
+                layer_z,
+                components=[component.physicality.Physicality],
+            ):
+                if entity.components[component.physicality.Physicality].blocking:
+                    entity_x, entity_y, _ = entity.components[component.location.Location].xyz
+                    cost[entity_x - x.start, entity_y - y.start, layer_z - z.start] = 0
+                    if component.actor.Actor not in entity.components:
+                        static_cost[entity_x - x.start, entity_y - y.start, layer_z - z.start] = 0
+        self._cost[x, y, z] = cost
+        old_static_cost = self._static_cost[x, y, z]
+        if np.array_equal(old_static_cost, static_cost):
+            return
+        if static_cost.size == 1:
+            self._static_cost_pending.setdefault((x.start, y.start, z.start), int(old_static_cost.item()))
+        else:
+            self._static_cost_version += 1
+        self._static_cost[x, y, z] = static_cost
+
+    def index_rooms(self, doors: Iterable[tuple[int, int, int]] = ()) -> None:
+        """Rebuild `rooms` from the current room ids.
+
+        Each door is added to the rooms of its walkable neighbors, and those rooms are added to `door_rooms`.
+        """
+        labels = self.cells["room_id"][...] + 2  # Labels must be positive and room -1 is used.
+        walkable = self.palette["walkable"][self.cells["tile"][...]] != 0
+        walkable_counts = np.bincount(labels.ravel(), weights=walkable.ravel())
+        self.rooms = {}
+        self.door_rooms = {}
+        for label, bounds in enumerate(scipy.ndimage.find_objects(labels), start=1):
+            if bounds is None:
+                continue
+            self.rooms[label - 2] = Room(label - 2, bounds, int(walkable_counts[label]))
+        for x, y, z in doors:
+            neighbors = ((x - 1, y, z), (x + 1, y, z), (x, y - 1, z), (x, y + 1, z))
+            room_ids = {
+                int(self.cells["room_id"][xyz])
+                for xyz in neighbors
+                if 0 <= xyz[0] < self.width and 0 <= xyz[1] < self.height and walkable[xyz]
+            }
+            self.door_rooms[x, y, z] = sorted(room_ids)
+            for room_id in self.door_rooms[x, y, z]:
+                self.rooms[room_id].doors.append((x, y, z))
+        self.room_paths = RoomPathfinder(self)
+
+    def add_entity(self, xyz: tuple[int, int, int], entity: tcod.ecs.Entity) -> None:
+        """Add `entity` to the spatial index at `xyz`."""
+        self.entity_index.setdefault(xyz, []).append(entity)
+        if component.physicality.Physicality in entity.components:
+            self.update_cost(xyz)
+
+    def remove_entity(self, xyz: tuple[int, int, int], entity: tcod.ecs.Entity) -> None:
+        """Remove `entity` from the spatial index at `xyz`."""
+        entities = self.entity_index[xyz]
+        entities.remove(entity)
+        if not entities:
+            del self.entity_index[xyz]
+        if component.physicality.Physicality in entity.components:
+            self.update_cost(xyz)
+
+    def entities_at(
+        self,
+        xyz: tuple[int, int, int],
+        components: Iterable[Any] = (),
+    ) -> list[tcod.ecs.Entity]:
+        """Return the entities at `xyz` which have all of `components`."""
+        entities = self.entity_index.get(xyz)
+        if not entities:
+            return []
+        components = tuple(components)
+        return [entity for entity in entities if all(key in entity.components for key in components)]
+
+    def entities_in_rect(  # noqa: PLR0913
+        self,
+        left: int,
+        top: int,
+        right: int,
+        bottom: int,
+        z: int,
+        *,
+        components: Iterable[Any] = (),
+    ) -> list[tcod.ecs.Entity]:
+        """Return the entities within `left <= x < right` and `top <= y < bottom` on `z` which have all of `components`.
+
+        Whichever is smaller out of the area or the number of occupied positions is searched.
+        """
+        components = tuple(components)
+        if (right - left) * (bottom - top) <= len(self.entity_index):
+            positions: Iterable[tuple[int, int, int]] = (
+                (x, y, z) for x in range(left, right) for y in range(top, bottom) if (x, y, z) in self.entity_index
+            )
+        else:
+            positions = [
+                (x, y, z_) for x, y, z_ in self.entity_index if left <= x < right and top <= y < bottom and z_ == z
+            ]
+        return [entity for xyz in positions for entity in self.entities_at(xyz, components)]
+
+    @property
+    def data(self) -> ZoneData:
+        """A compatibility view of this zone as an array of `DTYPE`."""
+        return ZoneData(self)
+
+    def clear(self, tile: tiles.Tile, room_id: int = 0) -> None:
+        """Set every cell of this zone to `tile` and `room_id`.
 
-        tile = self.data["tile"][cam_left:cam_right, cam_top:cam_bottom, cam_z]
+        Chunked zones free all of their chunks.
+        """
+        self.cells.fill((self.get_tile_index(tile), room_id))
+        self.invalidate_static_layers()
+        self._cost = self._static_cost = None
 
-        console.ch[con_view] = tile["ch"]
-        console.fg[con_view] = tile["fg"]
-        console.bg[con_view] = tile["bg"]
+    def set_palette(self, palette: Sequence[tiles.Tile]) -> None:
+        """Replace the palette, this does not change the tile indexes in `cells`."""
+        self.palette = np.array(palette, dtype=tiles.DTYPE)
+        self.tile_indexes = {}
+        for i, tile in enumerate(palette):
+            self.tile_indexes.setdefault(tile, i)
+        self.invalidate_static_layers()
+        self._cost = self._static_cost = None
 
-        for entity in g.world.Q.all_of(components=[Graphic, component.location.Location]):
-            loc = entity.components[component.location.Location]
-            x = loc.x - cam_x
-            y = loc.y - cam_y
-            if 0 <= x < console.width and 0 <= y < console.height:
-                console.ch[x, y], console.fg[x, y] = entity.components[Graphic].get()
+    def get_tile_index(self, tile: tiles.Tile) -> int:
+        """Return the palette index of `tile`, adding it to the palette if it's new."""
+        if tile not in self.tile_indexes:
+            self.tile_indexes[tile] = len(self.palette)
+            self.palette = np.append(self.palette, np.array([tile], dtype=tiles.DTYPE))
+            if len(self.palette) > np.iinfo(self.cells.dtype["tile"]).max + 1:
+                self.cells = self.cells.astype(self.WIDE_CELL_DTYPE)
+        return self.tile_indexes[tile]
 
     def __getitem__(
         self,
         xyz: tuple[int, int, int],
     ) -> component.location.Location:
-        """Return a location, creating a new one if it doesn't exist."""
-        if xyz not in self.locations:
-            self.locations[xyz] = component.location.Location(self, *xyz)
-        return self.locations[xyz]
+        """Return the location at `xyz`, creating a new one if it doesn't exist."""
+        location = self.locations.get(xyz)
+        if location is None:
+            location = self.locations[xyz] = component.location.Location(self, *xyz)
+        return location
 
     @property
     def width(self) -> int:
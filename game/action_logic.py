@@ -5,6 +5,7 @@
 import tcod.ecs
 
 import component.actor
+from engine.message_log import MessageLog
 from game.action import Action, Success
 
 
@@ -23,4 +24,4 @@ def report(obj: tcod.ecs.Entity, string: str, **fmt: object) -> None:
         "you": "you",
         "You": "You",
     }
-    obj.registry[None].components[("log", list[str])].append(string.format(**substitutions, **fmt))
+    obj.registry[None].components[MessageLog].add(string, **substitutions, **fmt)
@@ -12,9 +12,10 @@
 import component.graphic
 from component.item import Item
 from component.location import Location
+from component.path_cache import PathCache
 from component.physicality import Physicality
 from component.verb import Interactable
-from engine.helpers import active_player, active_zone
+from engine.helpers import active_player
 from game.action import Action, ActionResult, Impossible, Success
 from game.action_logic import report
 
@@ -29,10 +30,17 @@ class BumpAction(Action):
 @attrs.define()
 class FightPlayer:
     def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
-        action = Follow(active_player()).__call__(entity)
-        if action:
-            return action
-        return Attack(active_player()).__call__(entity)
+        player = active_player()
+        location = entity.components[Location]
+        if location.is_adjacent(player.components[Location]):
+            return Attack(player).__call__(entity)
+        # All chasers share one distance map, which is only recomputed when the player moves or a door changes.
+        chase_field = location.zone.chase_field
+        chase_field.set_goal(player.components[Location].xyz)
+        step = chase_field.get_step(location.xyz)
+        if step is None:
+            return Impossible("No path to the player.")
+        return MoveTo(location.zone[step]).__call__(entity)
 
 
 def wait(_entity: tcod.ecs.Entity) -> ActionResult:
@@ -44,6 +52,8 @@ class Interact:
     target: tcod.ecs.Entity
 
     def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
+        if component.actor.Actor in self.target.components:
+            component.actor.Actor.wake(self.target)
         if Interactable in self.target.components:
             return self.target.components[Interactable].interaction(entity, self.target)
         return Impossible("Not interactable.")
@@ -53,7 +63,7 @@ def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
 class BumpInteract(BumpAction):
     def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
         destination = entity.components[Location] + self.direction
-        for target in entity.world.Q.all_of(tags=[destination], components=[Interactable]):
+        for target in destination.zone.entities_at(destination.xyz, [Interactable]):
             return Interact(target).__call__(entity)
         return Impossible("No target.")
 
@@ -83,7 +93,10 @@ def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
 
 @attrs.define()
 class Standby:
-    def __call__(self, _entity: tcod.ecs.Entity) -> ActionResult:
+    """Sleep without being scheduled until woken."""
+
+    def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
+        component.actor.Actor.sleep(entity)
         return Impossible("End of action.")
 
 
@@ -108,7 +121,7 @@ def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
 class BumpAttack(BumpAction):
     def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
         destination = entity.components[Location] + self.direction
-        for target in entity.world.Q.all_of(tags=[destination], components=[component.actor.Actor]):
+        for target in destination.zone.entities_at(destination.xyz, [component.actor.Actor]):
             return Attack(target).__call__(entity)
         return Impossible("Nothing to attack.")
 
@@ -131,7 +144,9 @@ def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
 class PickupGeneral:
     def get_items(self, entity: tcod.ecs.Entity) -> Iterator[ActionResult]:
         loc = entity.components[Location]
-        for target in entity.world.Q.all_of(tags=[loc, "IsItem"]):
+        for target in loc.zone.entities_at(loc.xyz):
+            if "IsItem" not in target.tags:
+                continue
             action = PickupItem(target).__call__(entity)
             if action:
                 yield action
@@ -148,11 +163,8 @@ class MoveTo:
     location: Location
 
     def __call__(self, actor: tcod.ecs.Entity) -> ActionResult:
-        if not self.location.data["tile"]["walkable"]:
+        if not self.location.zone.cost[self.location.xyz]:
             return Impossible("Blocked.")
-        for entity in actor.world.Q.all_of(tags=[self.location], components=[Physicality]):
-            if entity.components[Physicality].blocking:
-                return Impossible("Blocked.")
 
         old_xyz = actor.components[Location].xyz
         new_xyz = self.location.xyz
@@ -183,23 +195,19 @@ def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
 @attrs.define()
 class Follow:
     target: tcod.ecs.Entity
-    pathfinder: tcod.path.AStar | None = None
 
     def __call__(self, entity: tcod.ecs.Entity) -> ActionResult:
-        if self.pathfinder is None:
-            z = entity.components[Location].z
-            self.pathfinder = tcod.path.AStar(
-                entity.components[Location].zone.data["tile"]["walkable"][:, :, z],
-            )
-
-        my_coord = entity.components[Location].xyz[:2]
-        target_coord = self.target.components[Location].xyz[:2]
-        path = self.pathfinder.get_path(*my_coord, *target_coord)
-        if len(path) <= 1:
+        if PathCache not in entity.components:
+            entity.components[PathCache] = PathCache()
+        path_cache = entity.components[PathCache]
+        location = entity.components[Location]
+        step = path_cache.get_step(location, self.target.components[Location])
+        if step is None:
             return Impossible("Destination reached.")
-        return MoveTo(
-            active_zone()[(*path[0], entity.components[Location].xyz[2])],
-        ).__call__(entity)
+        result = MoveTo(location.zone[step]).__call__(entity)
+        if result:
+            path_cache.advance()
+        return result
 
 
 @attrs.define()
@@ -0,0 +1,38 @@
+"""Cached UI panels."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+import attrs
+import tcod.console
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+
+
+@attrs.define(eq=False)
+class Panel(Generic[KeyT]):
+    """An off-screen console which is only drawn again when the values it shows change.
+
+    `draw` is called with a cleared console and the key passed to `get` whenever that key differs from the last one.
+    """
+
+    width: int
+    height: int
+    draw: Callable[[tcod.console.Console, KeyT], None]
+    console: tcod.console.Console = attrs.field(init=False)
+    key: KeyT | None = attrs.field(init=False, default=None)
+    drawn: bool = attrs.field(init=False, default=False)
+
+    def __attrs_post_init__(self) -> None:
+        self.console = tcod.console.Console(self.width, self.height, order="F")
+
+    def get(self, key: KeyT) -> tcod.console.Console:
+        """Return this panel drawn for `key`, reusing the last drawing if `key` hasn't changed."""
+        if not self.drawn or key != self.key:
+            self.console.clear()
+            self.draw(self.console, key)
+            self.key = key
+            self.drawn = True
+        return self.console
@@ -51,3 +51,10 @@ def on_draw(self, console: tcod.console.Console) -> None:  # noqa: ARG002
     def on_event(self, event: tcod.event.Event) -> StateResult:  # noqa: ARG002
         """Called when a state handles an event."""
         return None
+
+    def is_dirty(self) -> bool:
+        """Return True if this state needs to be drawn again.
+
+        States which don't track their changes are drawn after every batch of events.
+        """
+        return True
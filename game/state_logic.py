@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import tcod.console
 import tcod.event
 
 import g
-from game.state import Pop, Push, Rebase, StateResult
+from game.state import Pop, Push, Rebase, State, StateResult
 
 CONSOLE_MIN_SIZE = 80, 25
+# Window events which mean the window contents need to be presented again.
+REDRAW_WINDOW_EVENTS = frozenset(
+    {"WindowShown", "WindowExposed", "WindowResized", "WindowSizeChanged", "WindowMaximized", "WindowRestored"},
+)
 
 
 def handle_result(result: StateResult) -> None:
@@ -28,11 +33,27 @@ def handle_result(result: StateResult) -> None:
 
 
 def loop() -> None:
-    """State based game loop."""
+    """State based game loop.
+
+    The console is reused between frames and is only reallocated when the window size changes.
+    Frames are only drawn and presented when the window, the top state, or the console size has changed,
+    or when the top state reports itself as dirty.
+    """
+    drawn_state: State | None = None
+    redraw = True
     while g.states:
-        g.console = g.context.new_console(*CONSOLE_MIN_SIZE, order="F")
-        g.states[-1].on_draw(g.console)
-        g.context.present(g.console, integer_scaling=True, keep_aspect=True)
+        console_size = g.context.recommended_console_size(*CONSOLE_MIN_SIZE)
+        if (g.console.width, g.console.height) != console_size:
+            g.console = tcod.console.Console(*console_size, order="F")
+            redraw = True
+        state = g.states[-1]
+        if redraw or state is not drawn_state or state.is_dirty():
+            state.on_draw(g.console)
+            g.context.present(g.console, integer_scaling=True, keep_aspect=True)
+            drawn_state = state
+            redraw = False
         for event in tcod.event.wait():
+            if isinstance(event, tcod.event.WindowEvent) and event.type in REDRAW_WINDOW_EVENTS:
+                redraw = True
             if g.states:
                 g.states[-1].on_event(event)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import attrs
 import tcod.console
 import tcod.event
@@ -10,9 +12,15 @@
 import game.actions
 from component.location import Location
 from engine.helpers import active_player, active_zone, get_controlled_actor
+from engine.journal import JournalWriter
+from engine.message_log import MessageLog
 from game.action_logic import do_action
+from game.panel import Panel
 from game.state import State, StateResult
 
+if TYPE_CHECKING:
+    from game.action import Action
+
 WAIT_KEYS = (
     tcod.event.KeySym.COMMA,
     tcod.event.KeySym.KP_5,
@@ -54,6 +62,25 @@
 )
 
 
+def draw_status_panel(console: tcod.console.Console, key: tuple[int, tuple[int, int, int], int]) -> None:
+    """Draw the turn time, player position and current room, `key` is `(time, xyz, room_id)`."""
+    time, xyz, room_id = key
+    console.draw_rect(0, 0, 1, console.height, ord("│"))
+    console.draw_rect(1, console.height - 1, console.width, 1, ord("─"))
+    console.draw_rect(0, console.height - 1, 1, 1, ord("└"))
+    console.print(1, 0, f"Time: {time}")
+    console.print(1, 1, f"Pos: {xyz}")
+    console.print(1, 2, f"{active_zone().room_types[room_id]}")
+
+
+def draw_log_panel(console: tcod.console.Console, key: int) -> None:  # noqa: ARG001
+    """Draw the most recent messages of the log, `key` is the version of the log."""
+    console.draw_rect(0, 0, console.width, 1, ord("─"))
+    console.draw_rect(console.width - 1, 1, 1, console.height, ord("│"))
+    console.draw_rect(console.width - 1, 0, 1, 1, ord("┐"))
+    g.world[None].components[MessageLog].render(console)
+
+
 @attrs.define()
 class MainMenu(State):
     def on_enter(self) -> None:
@@ -62,52 +89,53 @@ def on_enter(self) -> None:
 
 @attrs.define()
 class Game(State):
+    dirty: bool = True
+    status_panel: Panel[tuple[int, tuple[int, int, int], int]] = attrs.field(
+        factory=lambda: Panel(20, 20, draw_status_panel),
+    )
+    log_panel: Panel[int] = attrs.field(factory=lambda: Panel(80, 10, draw_log_panel))
+
     def on_enter(self) -> None:
         active_zone().simulate()
+        self.dirty = True
 
     def on_draw(self, console: tcod.console.Console) -> None:
         active_zone().render(console)
-        self.draw_ui()
-
-    def draw_ui(self) -> None:
-        ui_console = tcod.console.Console(20, 20, order="F")
-        ui_console.draw_rect(0, 0, 1, ui_console.height, ord("│"))
-        ui_console.draw_rect(1, ui_console.height - 1, ui_console.width, 1, ord("─"))
-        ui_console.draw_rect(0, ui_console.height - 1, 1, 1, ord("└"))
-        ui_console.print(1, 0, f"Time: {active_zone().tqueue.time}")
-        ui_console.print(1, 1, f"Pos: {active_player().components[Location].xyz}")
-        room_name = active_zone().room_types[active_zone().data["room_id"][active_player().components[Location].xyz]]
-        ui_console.print(1, 2, f"{room_name}")
-
-        ui_console.blit(g.console, g.console.width - ui_console.width, 0, bg_alpha=0.9)
-
-        log_console = tcod.console.Console(80, 10, order="F")
-        log_console.draw_rect(0, 0, log_console.width, 1, ord("─"))
-        log_console.draw_rect(log_console.width - 1, 1, 1, log_console.height, ord("│"))
-        log_console.draw_rect(log_console.width - 1, 0, 1, 1, ord("┐"))
-        y = log_console.height
-        for log in reversed(g.world[None].components["log", list[str]]):
-            y -= tcod.console.get_height_rect(log_console.width, log)
-            if y < 0:
-                break
-            log_console.print_box(0, y, 0, 0, log)
-
-        log_console.blit(g.console, 0, g.console.height - log_console.height, bg_alpha=0.9)
+        self.draw_ui(console)
+        self.dirty = False
+
+    def is_dirty(self) -> bool:
+        return self.dirty
+
+    def draw_ui(self, console: tcod.console.Console) -> None:
+        zone = active_zone()
+        xyz = active_player().components[Location].xyz
+        status_console = self.status_panel.get((zone.tqueue.time, xyz, int(zone.data["room_id"][xyz])))
+        status_console.blit(console, console.width - status_console.width, 0, bg_alpha=0.9)
+
+        log_console = self.log_panel.get(g.world[None].components[MessageLog].version)
+        log_console.blit(console, 0, console.height - log_console.height, bg_alpha=0.9)
 
     def on_event(self, event: tcod.event.Event) -> StateResult:
         if isinstance(event, tcod.event.Quit):
             raise SystemExit
         if isinstance(event, tcod.event.KeyDown):
-            player = get_controlled_actor()
+            action: Action
             if event.sym in DIR_KEYS:
-                do_action(player, game.actions.Bump((*DIR_KEYS[event.sym], 0)))
+                action = game.actions.Bump((*DIR_KEYS[event.sym], 0))
             elif event.sym in WAIT_KEYS:
-                do_action(player, game.actions.wait)
+                action = game.actions.wait
             elif event.sym in CANCEL_KEYS:
-                do_action(player, game.actions.ReturnControlToPlayer())
+                action = game.actions.ReturnControlToPlayer()
             elif event.sym in PICKUP_KEYS:
-                do_action(player, game.actions.PickupGeneral())
+                action = game.actions.PickupGeneral()
             else:
                 print(event)
+                return None
+            journal = g.world[None].components.get(JournalWriter)
+            if journal is not None:
+                journal.record(g.world, action)
+            do_action(get_controlled_actor(), action)
             active_zone().simulate()
+            self.dirty = True
         return None
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+from pathlib import Path
 from typing import Any
 
 import tcod.console
@@ -13,6 +15,7 @@
 import game.state
 import game.state_logic
 import game.states
+from engine.journal import JournalWriter
 
 CONFIG: dict[str, Any] = {
     "width": 800,
@@ -26,10 +29,21 @@
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", type=Path, help="record the player's actions to a journal for replays")
+    parser.add_argument("--debug", action="store_true", help="show how the rooms of the ship were connected")
+    args = parser.parse_args()
     with tcod.context.new(**CONFIG) as g.context:
         engine.model.init()
-        game.state_logic.handle_result(game.state.Rebase(game.states.Game()))
-        game.state_logic.loop()
+        if args.record is not None:
+            seed = g.world[None].components[("seed", int)]
+            g.world[None].components[JournalWriter] = JournalWriter(args.record, seed)
+        try:
+            game.state_logic.handle_result(game.state.Rebase(game.states.Game()))
+            game.state_logic.loop()
+        finally:
+            if JournalWriter in g.world[None].components:
+                g.world[None].components[JournalWriter].close()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import attrs
 import tcod.ecs
 
 import component.graphic
@@ -17,7 +18,13 @@ def interaction(
         target: tcod.ecs.Entity,
     ) -> ActionResult:
         del target.components[component.graphic.Graphic]
-        target.components[component.physicality.Physicality].blocking = False
+        target.components[component.physicality.Physicality] = attrs.evolve(
+            target.components[component.physicality.Physicality],
+            blocking=False,
+        )
+        location = target.components[Location]
+        for room_id in location.zone.door_rooms.get(location.xyz, ()):
+            location.zone.wake_room(room_id)
         report(issuer, "{You} open the door.")
         return Success()
 
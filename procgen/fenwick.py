@@ -0,0 +1,65 @@
+"""Binary indexed tree for weighted sampling."""
+
+from __future__ import annotations
+
+
+class FenwickTree:
+    """A growable list of non-negative integer weights with O(log n) updates and weighted lookups.
+
+    Picking `tree.bisect(rng.random() * tree.total)` gives the same index as `rng.choices` would with the same weights.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty tree."""
+        self.weights: list[int] = []
+        self.tree: list[int] = [0]  # 1-indexed partial sums.
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def __getitem__(self, index: int) -> int:
+        return self.weights[index]
+
+    def __setitem__(self, index: int, weight: int) -> None:
+        """Change the weight at `index`."""
+        delta = weight - self.weights[index]
+        if not delta:
+            return
+        self.weights[index] = weight
+        self.total += delta
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, end: int) -> int:
+        """Return the sum of `weights[:end]`."""
+        total = 0
+        while end > 0:
+            total += self.tree[end]
+            end &= end - 1
+        return total
+
+    def append(self, weight: int) -> None:
+        """Add a new weight to the end of the tree."""
+        self.weights.append(weight)
+        self.total += weight
+        i = len(self.weights)
+        self.tree.append(weight + self.prefix_sum(i - 1) - self.prefix_sum(i - (i & -i)))
+
+    def bisect(self, value: float) -> int:
+        """Return the index of the first weight where the cumulative sum is greater than `value`.
+
+        This matches `bisect.bisect_right` on the accumulated weights, so zero weights are never returned.
+        """
+        index = 0
+        cumulative = 0
+        step = 1 << len(self.weights).bit_length()
+        while step:
+            next_index = index + step
+            if next_index < len(self.tree) and cumulative + self.tree[next_index] <= value:
+                index = next_index
+                cumulative += self.tree[next_index]
+            step >>= 1
+        return index
@@ -0,0 +1,174 @@
+"""On-disk cache of generated ship layouts."""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+import procgen.shipgen
+import tiles
+
+# Modules which change the output of ship generation.
+GENERATOR_MODULES = (
+    "engine.zone",
+    "procgen.fenwick",
+    "procgen.growing_tree",
+    "procgen.shipgen",
+    "tiles",
+)
+DATA_FILE = "data.npy"
+MANIFEST_FILE = "manifest.json"
+
+
+@functools.cache
+def generator_version() -> str:
+    """Return a hash of the source code of the ship generator."""
+    digest = hashlib.sha256()
+    for name in GENERATOR_MODULES:
+        module = importlib.import_module(name)
+        assert module.__file__
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _qualified_name(obj: Any) -> str:  # noqa: ANN401
+    return f"{obj.__module__}:{obj.__qualname__}"
+
+
+def _resolve_name(name: str) -> Any:  # noqa: ANN401
+    module_name, _, qualname = name.partition(":")
+    obj: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+class ShipCache:
+    """A directory of ship layouts keyed by seed and generator version.
+
+    Each entry holds the zone cells as an `.npy` file and a JSON manifest of the tile palette, room types and spawns.
+    The least recently used entries are removed once the cache is larger than `max_bytes`.
+
+    The cache is best effort: `load_or_generate` still returns a layout when the cache can't be read or written.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """Open the cache at `path`, creating the directory if possible."""
+        self.path = path
+        self.max_bytes = max_bytes
+        with contextlib.suppress(OSError):  # Writes will fail later, which `load_or_generate` ignores.
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def get_entry_path(self, seed: int) -> Path:
+        """Return the directory of the entry for `seed`."""
+        return self.path / f"{seed}-{generator_version()}"
+
+    def get(self, seed: int) -> procgen.shipgen.ShipLayout | None:
+        """Return the cached layout for `seed` or None.
+
+        The zone cells are memory-mapped copy-on-write, so they're only copied into memory where they're written to.
+        """
+        entry = self.get_entry_path(seed)
+        try:
+            manifest = json.loads((entry / MANIFEST_FILE).read_text(encoding="utf-8"))
+            cells = np.load(entry / DATA_FILE, mmap_mode="c")
+            factories = [_resolve_name(name) for name in manifest["factories"]]
+            layout = procgen.shipgen.ShipLayout(
+                seed=manifest["seed"],
+                cells=cells,
+                palette=[
+                    tiles.Tile(ch, tuple(fg), tuple(bg), walkable, transparent)
+                    for ch, fg, bg, walkable, transparent in manifest["palette"]
+                ],
+                room_types={int(room_id): _resolve_name(name)() for room_id, name in manifest["room_types"].items()},
+                spawns=[
+                    procgen.shipgen.Spawn(factories[factory], (x, y, z)) for factory, x, y, z in manifest["spawns"]
+                ],
+                player=manifest["player"],
+            )
+        except (OSError, ValueError, LookupError, TypeError, AttributeError, ImportError):
+            # Unreadable, or refers to factories and room types which were renamed since it was stored.
+            return None
+        with contextlib.suppress(OSError):  # The cache may be read-only.
+            os.utime(entry / MANIFEST_FILE)  # Mark as recently used.
+        return layout
+
+    def put(self, layout: procgen.shipgen.ShipLayout) -> None:
+        """Store `layout` in the cache, then evict old entries.
+
+        If another process stores the same entry at the same time then its entry is kept.
+
+        Raises:
+            OSError: The entry could not be written.
+        """
+        factories = sorted({_qualified_name(spawn.factory) for spawn in layout.spawns})
+        manifest = {
+            "seed": layout.seed,
+            "player": layout.player,
+            "palette": layout.palette,
+            "room_types": {room_id: _qualified_name(type(room)) for room_id, room in layout.room_types.items()},
+            "factories": factories,
+            "spawns": [[factories.index(_qualified_name(spawn.factory)), *spawn.xyz] for spawn in layout.spawns],
+        }
+        entry = self.get_entry_path(layout.seed)
+        # Write to a temporary directory first so that a partial entry is never visible.
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.path, prefix=".tmp-"))
+        try:
+            np.save(tmp_dir / DATA_FILE, layout.cells[...])
+            (tmp_dir / MANIFEST_FILE).write_text(json.dumps(manifest, separators=(",", ":")), encoding="utf-8")
+            shutil.rmtree(entry, ignore_errors=True)  # Replace an unreadable entry.
+            try:
+                tmp_dir.rename(entry)
+            except OSError:
+                if not entry.is_dir():
+                    raise
+                # Another process stored this entry after it was removed, entries for a seed are always the same.
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict(keep=entry)
+
+    def evict(self, keep: Path | None = None) -> None:
+        """Remove the least recently used entries until the cache fits in `max_bytes`."""
+        entries = []
+        for entry in self.path.iterdir():
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                last_used = (entry / MANIFEST_FILE).stat().st_mtime
+            except OSError:
+                last_used = 0
+            entries.append((last_used, sum(file.stat().st_size for file in entry.iterdir()), entry))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def load_or_generate(self, seed: int) -> procgen.shipgen.ShipLayout:
+        """Return the layout for `seed`, generating and caching it on a miss.
+
+        The cache is skipped with `--debug`, since debug ships are not the normal generator output.
+        """
+        if "--debug" in sys.argv:
+            return procgen.shipgen.Ship(seed).get_layout()
+        layout = self.get(seed)
+        if layout is None:
+            layout = procgen.shipgen.Ship(seed).get_layout()
+            with contextlib.suppress(OSError):  # Caching is optional.
+                self.put(layout)
+        return layout
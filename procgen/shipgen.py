@@ -3,25 +3,31 @@
 import itertools
 import random
 import sys
-from collections.abc import Iterator
-from typing import Any
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
 
+import attrs
 import numpy as np
 import scipy.signal  # type: ignore[import-untyped]
 import tcod.ecs
 import tcod.libtcodpy
 from numpy.typing import NDArray
 
+import engine.chunked
 import engine.zone
-import g
 import obj.door
 import obj.item
 import obj.living
 import obj.machine
 import obj.robot
 import tiles
+from procgen.fenwick import FenwickTree
 from procgen.growing_tree import AbstractGrowingTree
 
+if TYPE_CHECKING:
+    from component.location import Location
+
 
 class ProcGenError(Exception):
     pass
@@ -46,13 +52,21 @@ def __str__(self) -> str:
         return self.name
 
     def get_area(self, room_id: int, ship: Ship) -> NDArray[np.bool_]:
-        area: NDArray[np.bool_] = ship.zone.data["room_id"] == room_id
-        area &= ship.zone.data["tile"]["walkable"] != 0
+        """Return the walkable area of this room within its bounding box."""
+        bounds = ship.zone.rooms[room_id].bounds
+        area: NDArray[np.bool_] = ship.zone.data["room_id"][bounds] == room_id
+        area &= ship.zone.data["tile"][bounds]["walkable"] != 0
         return area
 
+    def sample(self, room_id: int, ship: Ship, k: int) -> list[tuple[int, int, int]]:
+        """Return `k` random walkable positions in this room, or nothing if the room has no area."""
+        if room_id not in ship.zone.rooms:
+            return []
+        return ship.np_sample(self.get_area(room_id, ship), k, ship.zone.rooms[room_id].origin)
+
     def finalize(self, room_id: int, ship: Ship) -> None:
-        for xyz in ship.np_sample(self.get_area(room_id, ship), 1):
-            obj.item.new_item(g.world, ship.zone[xyz])
+        for xyz in self.sample(room_id, ship, 1):
+            ship.spawn(obj.item.new_item, xyz)
 
 
 class Corridor(RoomType):
@@ -83,9 +97,9 @@ class Hangar(RoomType):
     max_size = (8, 4)
 
     def finalize(self, room_id: int, ship: Ship) -> None:
-        pos1, pos2 = ship.np_sample(self.get_area(room_id, ship), 2)
-        ship.player = obj.living.new_player(g.world, ship.zone[pos1])
-        obj.robot.new_robot(g.world, ship.zone[pos2])
+        pos1, pos2 = self.sample(room_id, ship, 2)
+        ship.player_spawn = ship.spawn(obj.living.new_player, pos1)
+        ship.spawn(obj.robot.new_robot, pos2)
 
 
 class BasePowerRoom(RoomType):
@@ -102,9 +116,9 @@ class DriveCore(BasePowerRoom):
     max_size = (4, 4)
 
     def finalize(self, room_id: int, ship: Ship) -> None:
-        pos1, pos2 = ship.np_sample(self.get_area(room_id, ship), 2)
-        obj.machine.new_drive_core(g.world, ship.zone[pos1])
-        obj.item.new_spare_core(g.world, ship.zone[pos2])
+        pos1, pos2 = self.sample(room_id, ship, 2)
+        ship.spawn(obj.machine.new_drive_core, pos1)
+        ship.spawn(obj.item.new_spare_core, pos2)
 
 
 class Solars(BasePowerRoom):
@@ -134,27 +148,36 @@ def __init__(self, ship: Ship) -> None:
         super().__init__()
         # Connected rooms: Tuple[axis, index, room_id1, room_id2]
         self.connected: set[tuple[int, int, int, int]] = set()
+        # The weight of the edges from each stem node towards each of CARDINALS, stored in stem order.
+        # Stem nodes are not removed from the stem, instead the weights of their edges drop to zero.
+        self.frontier = FenwickTree()
+        self.stem_index: dict[tuple[int, int, int], int] = {}
         self.visit(self.ship.root_node, None)
 
     def grow(self) -> None:
         """Run a single step of the growing tree algorithm."""
         assert self.stem
-        neighbors = list(self.get_all_neighbors())
-        if not neighbors:
+        if not self.frontier.total:
             self.stem = []
             return
-        nodes, weights = zip(*neighbors, strict=True)
-        neighbor, stem = self.ship.rng.choices(list(nodes), weights)[0]
-        self.visit(neighbor, stem)
-        if not list(self.get_neighbors(stem)):
-            self.stem.remove(stem)
-
-    def get_all_neighbors(
-        self,
-    ) -> Iterator[tuple[tuple[tuple[int, int, int], tuple[int, int, int]], int]]:
-        for node in self.stem:
-            for neighbor, weight in self.get_neighbors(node):
-                yield (neighbor, node), weight
+        edge = self.frontier.bisect(self.ship.rng.random() * self.frontier.total)
+        stem = self.stem[edge // len(self.CARDINALS)]
+        x, y = self.CARDINALS[edge % len(self.CARDINALS)]
+        self.visit((stem[0] + x, stem[1] + y, stem[2]), stem)
+
+    def update_frontier(self, node: tuple[int, int, int]) -> None:
+        """Add the newest stem `node` to the frontier and remove the edges leading to it."""
+        adjacent = [(node[0] + x, node[1] + y, node[2]) for x, y in self.CARDINALS]
+        for direction, neighbor in enumerate(adjacent):
+            if neighbor in self.stem_index:
+                # CARDINALS are in opposite pairs.
+                self.frontier[self.stem_index[neighbor] * len(self.CARDINALS) + (direction ^ 1)] = 0
+        weights = [0] * len(self.CARDINALS)
+        for neighbor, weight in self.get_neighbors(node):
+            weights[adjacent.index(neighbor)] += weight
+        self.stem_index[node] = len(self.stem) - 1
+        for weight in weights:
+            self.frontier.append(weight)
 
     def select_stem(self) -> int:
         return self.ship.rng.randint(0, len(self.stem) - 1)
@@ -215,8 +238,7 @@ def visit(
     ) -> None:
         super().visit(node, prev)
         self.visited[node] = True
-        if not list(self.get_neighbors(node)):
-            self.stem.remove(node)
+        self.update_frontier(node)
         if prev is None:
             return
         if prev[2] != node[2]:
@@ -246,13 +268,13 @@ def connect_rooms(
             assert room_a[1] == room_b[1]
             door_y += self.ship.rng.randint(1, self.ship.room_height - 1)
         door = door_x, door_y, room_b[2]
-        if self.ship.zone.data["tile"]["walkable"][door]:
+        if self.ship.zone.data["tile"][door]["walkable"]:
             return
         self.ship.zone.data["tile"][door] = max(
             self.ship.room_types[self.ship.rooms[room_a]],
             self.ship.room_types[self.ship.rooms[room_b]],
         ).floor
-        obj.door.new_auto_door(g.world, self.ship.zone[door])
+        self.ship.spawn(obj.door.new_auto_door, door)
 
     def connect_rooms_debug(
         self,
@@ -268,30 +290,164 @@ def connect_rooms_debug(
         self.ship.zone.data["tile"][line] = tiles.metal_floor._replace(bg=(0, 255, 0))
 
 
+class OccupancyIndex:
+    """A summed-area table of the claimed cells of `Ship.rooms`.
+
+    `table[x, y, z]` is the number of claimed cells in `rooms[:x, :y, z]`, so the number of claimed cells in any
+    rectangle can be found with four lookups.
+    """
+
+    def __init__(self, rooms: NDArray[np.integer[Any]]) -> None:
+        width, height, depth = rooms.shape
+        self.table: NDArray[np.intp] = np.zeros((width + 1, height + 1, depth), dtype=np.intp)
+        self.table[1:, 1:, :] = (rooms != 0).cumsum(axis=0).cumsum(axis=1)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """The width and height of the indexed rooms."""
+        return self.table.shape[0] - 1, self.table.shape[1] - 1
+
+    def claim(self, index: tuple[slice, slice], floor: int) -> None:
+        """Mark an unclaimed rectangle as claimed."""
+        x, y = index
+        # Each cell of the table gains the overlap between the new room and the area it sums.
+        cols = np.clip(np.arange(self.table.shape[0]) - x.start, 0, x.stop - x.start)
+        rows = np.clip(np.arange(self.table.shape[1]) - y.start, 0, y.stop - y.start)
+        self.table[:, :, floor] += np.outer(cols, rows)
+
+    def get_free_corners(self, sizes: Sequence[tuple[int, int]], floor: int) -> NDArray[np.bool_]:
+        """Return where each size of room can fit.
+
+        The result has the shape `(len(sizes), width, height)` and is True at every unclaimed top-left corner.
+        """
+        width, height = self.shape
+        table = self.table[:, :, floor]
+        size_w, size_h = np.asarray(sizes, dtype=np.intp).reshape(-1, 2).T[:, :, np.newaxis, np.newaxis]
+        left = np.arange(width)[:, np.newaxis]
+        top = np.arange(height)[np.newaxis, :]
+        right = left + size_w
+        bottom = top + size_h
+        in_bounds = (right <= width) & (bottom <= height)
+        right = np.minimum(right, width)
+        bottom = np.minimum(bottom, height)
+        claimed = table[right, bottom] - table[left, bottom] - table[right, top] + table[left, top]
+        return in_bounds & (claimed == 0)  # type: ignore[no-any-return]
+
+
+@attrs.frozen
+class Spawn:
+    """A record of an entity to be created once a ship is placed in a world."""
+
+    factory: Callable[[tcod.ecs.World, Location], tcod.ecs.Entity]
+    xyz: tuple[int, int, int]
+
+    @property
+    def is_door(self) -> bool:
+        """True if this spawns a door."""
+        return self.factory is obj.door.new_auto_door
+
+
+@attrs.define
+class ShipLayout:
+    """The self-contained result of ship generation.
+
+    This holds no references to any world and can be pickled and sent between processes.
+    """
+
+    seed: int
+    cells: NDArray[Any] | engine.chunked.ChunkedArray  # Zone.cells
+    palette: list[tiles.Tile]  # Zone.palette
+    room_types: dict[int, RoomType]
+    spawns: list[Spawn]
+    player: int  # The index of the player in spawns.
+
+    def materialize(self, world: tcod.ecs.World) -> tcod.ecs.Entity:
+        """Make a new zone from this layout active in `world`, spawn its entities, and return the player.
+
+        The zone uses `cells` without copying it, so a layout should only be materialized once.
+        """
+        width, height, depth = self.cells.shape
+        zone = engine.zone.Zone((width, height, depth), cells=self.cells)
+        zone.set_palette(self.palette)
+        zone.room_types = self.room_types
+        zone.index_rooms(spawn.xyz for spawn in self.spawns if spawn.is_door)
+        world[None].components[engine.zone.Zone] = zone
+        entities = [spawn.factory(world, zone[spawn.xyz]) for spawn in self.spawns]
+        return entities[self.player]
+
+
 class Ship:
     start_position: tuple[int, int, int]
-    player: tcod.ecs.Entity
+    player_spawn: int
     room_width = 4
     room_height = 4
+    length = 64
+    half_width = 8
+    depth = 1
+    chunk_shape: tuple[int, int, int] | None = None  # Set to store very large ships in a chunked zone.
 
     def __init__(self, seed: int | None = None) -> None:
         if seed is None:
             seed = random.getrandbits(64)
+        self.seed = seed
         self.rng = random.Random(seed)
+        self.spawns: list[Spawn] = []
         self.generate()
 
-    def np_sample(self, array: NDArray[Any], k: int) -> list[tuple[Any, ...]]:
-        if not np.any(array):
-            return []
-        return self.rng.sample(list(zip(*array.nonzero(), strict=False)), k)
+    def spawn(
+        self,
+        factory: Callable[[tcod.ecs.World, Location], tcod.ecs.Entity],
+        xyz: tuple[int, int, int],
+    ) -> int:
+        """Record an entity to be spawned at `xyz` and return its index in `spawns`."""
+        x, y, z = xyz
+        self.spawns.append(Spawn(factory, (int(x), int(y), int(z))))
+        return len(self.spawns) - 1
+
+    def get_layout(self) -> ShipLayout:
+        """Return the results of this ship's generation."""
+        return ShipLayout(
+            self.seed,
+            self.zone.cells,
+            list(self.zone.tile_indexes),
+            self.room_types,
+            self.spawns,
+            self.player_spawn,
+        )
+
+    def np_sample(
+        self,
+        array: NDArray[Any],
+        k: int,
+        origin: tuple[int, int, int] = (0, 0, 0),
+    ) -> list[tuple[int, int, int]]:
+        """Return `k` random coordinates of the nonzero cells of the 3D `array`.
+
+        `origin` is the position of `array[0, 0, 0]` and is added to the results.
+
+        Only the bounding box of the nonzero cells is searched.  The results are the same as sampling from the list of
+        all nonzero coordinates, without building that list.
+        """
+        bounds = []
+        for axis in range(array.ndim):
+            other_axes = tuple(i for i in range(array.ndim) if i != axis)
+            nonzero = np.flatnonzero(np.any(array, axis=other_axes))
+            if not nonzero.size:
+                return []
+            bounds.append(slice(int(nonzero[0]), int(nonzero[-1]) + 1))
+        area = array[tuple(bounds)]
+        # Sampling from a range consumes the RNG the same way as sampling from a list of the same length.
+        indexes = self.rng.sample(range(np.count_nonzero(area)), k)
+        coords = np.unravel_index(np.flatnonzero(area)[indexes], area.shape)
+        left, top, floor = (bound.start + offset for bound, offset in zip(bounds, origin, strict=True))
+        return [(int(x) + left, int(y) + top, int(z) + floor) for x, y, z in zip(*coords, strict=True)]
 
     def generate(self) -> None:
-        self.length = 64
-        self.half_width = 8
-        self.depth = 1
         self.width = self.half_width * 2 + self.rng.randint(0, 1)
-        self.zone = engine.zone.Zone((self.length * self.room_width + 1, self.width * self.room_height + 1, self.depth))
-        g.world[None].components[engine.zone.Zone] = self.zone
+        self.zone = engine.zone.Zone(
+            (self.length * self.room_width + 1, self.width * self.room_height + 1, self.depth),
+            self.chunk_shape,
+        )
 
         self.form = np.zeros((self.depth, self.length), dtype=int)
         self.rooms = np.zeros((self.length, self.width, self.depth), dtype=int, order="F")
@@ -310,6 +466,7 @@ def generate(self) -> None:
             Nuclear,
             Bridge,
         ]
+        self.occupancy = OccupancyIndex(self.rooms)
         for room_cls in vital_rooms:
             self.add_new_room(room_cls(), 0)
         try:
@@ -349,36 +506,31 @@ def add_new_room(self, room: RoomType, floor: int = 0) -> None:  # noqa: ARG002
             ),
         )
         self.rng.shuffle(sizes)
-        for size in sizes:
-            try:
-                self.rooms[self.get_free_space(size, 0)] = self.next_room_id
-                break
-            except NoRoomError:
-                pass
-        else:
+        try:
+            index = self.get_free_space(sizes, 0)
+        except NoRoomError:
             msg = f"Could not fit {room}."
-            raise NoRoomError(msg)
+            raise NoRoomError(msg) from None
+        self.rooms[index] = self.next_room_id
+        self.occupancy.claim(index, 0)
         self.room_types[self.next_room_id] = room
         self.next_room_id += 1
 
-    def get_free_space(self, size: tuple[int, int], floor: int) -> tuple[slice, slice]:
-        """Return the slice indexes of a an unclaimed area."""
-        width, height = size
-        room_area = np.ones((width, height), dtype=bool)
-        #  Convolve room_area into self.rooms, values of zero mean this room
-        #  will fit.
-        valid = scipy.signal.convolve(
-            (self.rooms[..., floor] != 0).astype(int),
-            room_area,
-            "full",
-        )[width - 1 : -width + 1, height - 1 : -height + 1]
-        valid = np.transpose((valid == 0).nonzero())
-        if not valid.size:
-            msg = "No space left for room."
-            raise NoRoomError(msg)
-        x, y = self.rng.choice(valid)
-        assert (self.rooms[x : x + width, y : y + height, floor] == 0).all()
-        return slice(x, x + width), slice(y, y + height)
+    def get_free_space(self, sizes: Sequence[tuple[int, int]], floor: int) -> tuple[slice, slice]:
+        """Return the slice indexes of a an unclaimed area.
+
+        `sizes` are tried in order, the first size which fits anywhere is used.
+        """
+        fits = self.occupancy.get_free_corners(sizes, floor)
+        for (width, height), free in zip(sizes, fits, strict=True):
+            valid = np.transpose(free.nonzero())
+            if not valid.size:
+                continue
+            x, y = self.rng.choice(valid)
+            assert (self.rooms[x : x + width, y : y + height, floor] == 0).all()
+            return slice(x, x + width), slice(y, y + height)
+        msg = "No space left for room."
+        raise NoRoomError(msg)
 
     def get_unclaimed_cell(self) -> tuple[int, int]:
         nz = self.get_unclaimed_cells().nonzero()
@@ -399,51 +551,65 @@ def get_unclaimed_cells(self) -> NDArray[np.bool_]:
         )
         return (neighbors != 0) & free  # type: ignore[no-any-return]
 
-    def finalize(self) -> None:  # noqa: C901
-        def get_room_type(cx: int, cy: int, cz: int) -> RoomType:
-            if 0 <= cx < self.rooms.shape[0] and 0 <= cy < self.rooms.shape[1]:
-                return self.room_types[self.rooms[cx, cy, cz]]
-            return self.room_types[-1]
-
-        def iter_cells() -> Iterator[tuple[int, int, int]]:
-            for z in range(self.rooms.shape[2]):
-                for y in range(self.rooms.shape[1] + 1):
-                    for x in range(self.rooms.shape[0] + 1):
-                        yield x, y, z
-
-        def get_merge_tile(*rooms: RoomType) -> tiles.Tile:
-            for room in rooms[1:]:
-                if rooms[0] is not room:
-                    break
-            else:
-                return rooms[0].floor
-            return max(rooms).wall
-
-        for cx, cy, cz in iter_cells():
-            room_type = get_room_type(cx, cy, cz)
-            left_type = get_room_type(cx - 1, cy, cz)
-            top_type = get_room_type(cx, cy - 1, cz)
-            top_left_type = get_room_type(cx - 1, cy - 1, cz)
-
-            left = cx * self.room_width
-            top = cy * self.room_height
-            right = left + self.room_width
-            bottom = top + self.room_height
-
-            left_tile = get_merge_tile(room_type, left_type)
-            top_tile = get_merge_tile(room_type, top_type)
-            top_left_tile = get_merge_tile(room_type, left_type, top_type, top_left_type)
-
-            self.zone.data["tile"][left, top, cz] = top_left_tile
-            self.zone.data["tile"][left + 1 : right, top, cz] = top_tile
-            self.zone.data["tile"][left, top + 1 : bottom, cz] = left_tile
-            self.zone.data["tile"][left + 1 : right, top + 1 : bottom, cz] = room_type.floor
-
-        self.zone.data["room_id"] = -1
+    def get_room_tiles(self) -> NDArray[np.intp]:
+        """Return the palette indexes for every tile of the zone.
+
+        The palette is `get_room_palette`.  Each room cell owns its top and left edges, edges between different room
+        types become the wall of the highest priority room.
+        """
+        priority = np.array([room.priority for room in self.get_room_palette_types()])
+        n_types = len(priority)
+        # Room type indexes of every cell, padded with Space on all sides.
+        padded = np.zeros((self.rooms.shape[0] + 2, self.rooms.shape[1] + 2, self.rooms.shape[2]), dtype=np.intp)
+        padded[1:-1, 1:-1, :] = self.rooms + 1
+        room = padded[1:, 1:]
+        left = padded[:-1, 1:]
+        top = padded[1:, :-1]
+        top_left = padded[:-1, :-1]
+
+        def merge(*rooms: NDArray[np.intp]) -> NDArray[np.intp]:
+            """Return the floor index if all rooms are the same, otherwise the wall index of the max priority room."""
+            same = np.logical_and.reduce([rooms[0] == other for other in rooms[1:]])
+            winner = rooms[0]
+            for other in rooms[1:]:
+                winner = np.where(priority[other] > priority[winner], other, winner)
+            return np.where(same, rooms[0], winner + n_types)
+
+        corner_tile = merge(room, left, top, top_left)
+        top_tile = merge(room, top)
+        left_tile = merge(room, left)
+
+        cell_x, offset_x = np.divmod(np.arange(self.zone.width)[:, np.newaxis, np.newaxis], self.room_width)
+        cell_y, offset_y = np.divmod(np.arange(self.zone.height)[np.newaxis, :, np.newaxis], self.room_height)
+        cell = cell_x, cell_y, np.arange(self.zone.depth)
+        return np.where(
+            offset_x == 0,
+            np.where(offset_y == 0, corner_tile[cell], left_tile[cell]),
+            np.where(offset_y == 0, top_tile[cell], room[cell]),
+        )
+
+    def get_room_palette_types(self) -> list[RoomType]:
+        """Return the room types in palette order, this is the room id plus one."""
+        return [self.room_types[room_id] for room_id in range(-1, self.next_room_id)]
+
+    def get_room_palette(self) -> list[tiles.Tile]:
+        """Return the tile palette for `get_room_tiles`, the floors of each room type followed by their walls."""
+        room_types = self.get_room_palette_types()
+        return [room.floor for room in room_types] + [room.wall for room in room_types]
+
+    def draw_rooms(self) -> None:
+        """Draw the tiles and room ids of `rooms` to the zone, leaving the rooms unconnected."""
+        self.zone.clear(tiles.space, -1)  # Chunks of only space stay unallocated.
+        zone_palette = np.array([self.zone.get_tile_index(tile) for tile in self.get_room_palette()])
+        self.zone.set_tile_indexes(..., zone_palette[self.get_room_tiles()])
+
         self.zone.data["room_id"][:-1, :-1, :] = np.kron(self.rooms, np.ones((self.room_width, self.room_height, 1)))
         self.zone.room_types = self.room_types
 
+    def finalize(self) -> None:
+        self.draw_rooms()
         ShipRoomConnector(self).generate()
+        self.zone.index_rooms(spawn.xyz for spawn in self.spawns if spawn.is_door)
 
         for room_id, room in self.room_types.items():
             room.finalize(room_id, self)
@@ -455,3 +621,18 @@ def icon(x: int, y: int) -> str:
             return f"""{self.rooms[x, y, 0] % 10:i}"""
 
         return "\n".join("".join(icon(x, y) for x in range(self.length)) for y in range(self.width))
+
+
+def generate_layout(seed: int) -> ShipLayout:
+    """Generate the ship for `seed` and return its layout."""
+    return Ship(seed).get_layout()
+
+
+def generate_many(seeds: Iterable[int], workers: int | None = None) -> list[ShipLayout]:
+    """Generate the ships for all `seeds` in parallel.
+
+    `workers` is the number of processes to use, defaulting to the number of CPUs.
+    Entities are only created once a layout is materialized into a world.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(generate_layout, seeds))
@@ -0,0 +1,75 @@
+"""Benchmark long paths over the room graph against a full grid A* search."""
+
+import sys
+import time
+
+sys.path.append(".")
+
+import numpy as np
+import tcod.ecs
+import tcod.path
+
+import engine.zone
+import g
+import procgen.shipgen
+from component.location import Location
+from component.verb import Interactable
+from engine.helpers import active_zone
+from engine.message_log import MessageLog
+from obj.door import DoorInteractable
+
+LENGTHS = (64, 256, 512)
+REPEATS = 10
+
+
+def make_zone(length: int, seed: int = 0) -> engine.zone.Zone:
+    """Return the zone of a ship of `length` rooms with all of its doors open."""
+    g.world = tcod.ecs.World()
+    g.world[None].components[MessageLog] = MessageLog()
+    ship_cls = type("LongShip", (procgen.shipgen.Ship,), {"length": length})
+    player = ship_cls(seed).get_layout().materialize(g.world)
+    for door in list(g.world.Q.all_of(components=[Interactable, Location])):
+        if isinstance(door.components[Interactable], DoorInteractable):
+            door.components[Interactable].interaction(player, door)
+    return active_zone()
+
+
+def get_center(zone: engine.zone.Zone, room: engine.zone.Room) -> tuple[int, int, int]:
+    """Return a walkable cell near the middle of `room`."""
+    walkable = (zone.cells["room_id"][room.bounds] == room.room_id) & (zone.static_cost[room.bounds] != 0)
+    cells = np.argwhere(walkable)
+    x, y, z = cells[len(cells) // 2]
+    return int(x) + room.bounds[0].start, int(y) + room.bounds[1].start, int(z) + room.bounds[2].start
+
+
+def bench_pathing(length: int) -> tuple[float, float, float]:
+    """Return the average seconds for grid A*, the room graph, and a cached room graph path between the ship's ends."""
+    zone = make_zone(length)
+    rooms = sorted((room for room in zone.rooms.values() if room.room_id > 1), key=lambda room: room.bounds[0].start)
+    start, goal = get_center(zone, rooms[0]), get_center(zone, rooms[-1])
+    cost = zone.static_cost[:, :, start[2]]
+
+    begin = time.perf_counter()
+    for _ in range(REPEATS):
+        tcod.path.AStar(cost).get_path(start[0], start[1], goal[0], goal[1])
+    flat = (time.perf_counter() - begin) / REPEATS
+
+    zone.room_paths.update()
+    zone.room_paths.compute_path(start, goal)  # Build the per-area pathfinders once.
+    begin = time.perf_counter()
+    for _ in range(REPEATS):
+        zone.room_paths.compute_path(start, goal)
+    rooms_time = (time.perf_counter() - begin) / REPEATS
+
+    zone.room_paths.get_path(start, goal)
+    begin = time.perf_counter()
+    for _ in range(REPEATS):
+        zone.room_paths.get_path(start, goal)
+    cached = (time.perf_counter() - begin) / REPEATS
+    return flat, rooms_time, cached
+
+
+if __name__ == "__main__":
+    for length in LENGTHS:
+        flat, rooms, cached = bench_pathing(length)
+        print(f"length={length:4d} grid={flat * 1000:8.2f}ms rooms={rooms * 1000:8.2f}ms cached={cached * 1000:8.3f}ms")
@@ -0,0 +1,32 @@
+"""Benchmark room connection time against ship length."""
+
+import sys
+import time
+
+sys.path.append(".")
+
+import procgen.shipgen
+
+LENGTHS = (32, 64, 128, 256, 512)
+
+
+class UnconnectedShip(procgen.shipgen.Ship):
+    """A ship which is generated up to connecting its rooms."""
+
+    def finalize(self) -> None:
+        """Stop before the rooms are connected."""
+        self.draw_rooms()
+
+
+def bench_connector(length: int, seed: int = 0) -> float:
+    """Return the time in seconds to connect the rooms of a ship of `length` rooms."""
+    ship_cls = type("LongShip", (UnconnectedShip,), {"length": length})
+    ship = ship_cls(seed)
+    start = time.perf_counter()
+    procgen.shipgen.ShipRoomConnector(ship).generate()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    for length in LENGTHS:
+        print(f"length={length:4d} connect={bench_connector(length) * 1000:8.2f}ms")
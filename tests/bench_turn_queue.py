@@ -0,0 +1,60 @@
+"""Benchmark the turn queue against a plain heap with many actors."""
+
+import heapq
+import itertools
+import random
+import sys
+import time
+
+sys.path.append(".")
+
+from engine.turn_queue import TurnQueue
+
+ACTORS = 100_000
+TURNS = 1_000_000
+INTERVALS = (100, 100, 100, 150)  # Mostly cardinal moves and waits with some diagonal moves.
+CANCEL_CHANCE = 0.05  # Chance of an actor being interrupted and scheduled again.
+
+
+def bench_turn_queue(seed: int = 0) -> float:
+    """Return the seconds taken to run `TURNS` turns of `ACTORS` actors on a `TurnQueue`."""
+    rng = random.Random(seed)
+    queue: TurnQueue[int] = TurnQueue()
+    start = time.perf_counter()
+    tickets = queue.schedule_many(0, range(ACTORS))
+    for _ in range(TURNS):
+        ticket = queue.pop()
+        tickets[ticket.value] = queue.schedule(rng.choice(INTERVALS), ticket.value)
+        if rng.random() < CANCEL_CHANCE:
+            other = rng.randrange(ACTORS)
+            queue.cancel(tickets[other])
+            tickets[other] = queue.schedule(rng.choice(INTERVALS), other)
+    return time.perf_counter() - start
+
+
+def bench_heap(seed: int = 0) -> float:
+    """Return the seconds taken to run the same turns on a heap of `(time, order, actor)` with lazy cancellation."""
+    rng = random.Random(seed)
+    order = itertools.count()
+    heap = [(0, next(order), actor) for actor in range(ACTORS)]
+    current = [entry[1] for entry in heap]  # The live entry of each actor, older entries are skipped.
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        now, entry, actor = heapq.heappop(heap)
+        while current[actor] != entry:
+            now, entry, actor = heapq.heappop(heap)
+        current[actor] = next(order)
+        heapq.heappush(heap, (now + rng.choice(INTERVALS), current[actor], actor))
+        if rng.random() < CANCEL_CHANCE:
+            other = rng.randrange(ACTORS)
+            current[other] = next(order)
+            heapq.heappush(heap, (now + rng.choice(INTERVALS), current[other], other))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    queue_time = bench_turn_queue()
+    heap_time = bench_heap()
+    print(f"actors={ACTORS} turns={TURNS}")
+    print(f"TurnQueue {queue_time:6.2f}s {queue_time / TURNS * 1e6:6.2f}us/turn")
+    print(f"heapq     {heap_time:6.2f}s {heap_time / TURNS * 1e6:6.2f}us/turn")
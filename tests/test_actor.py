@@ -0,0 +1,34 @@
+"""Tests for scheduling `component.actor.Actor` entities."""
+
+import pytest
+import tcod.ecs
+
+import engine.zone
+import g
+from component.actor import Actor
+from component.location import Location
+
+
+def make_world() -> tuple[tcod.ecs.World, engine.zone.Zone]:
+    """Return a new world with an empty active zone."""
+    world = tcod.ecs.World()
+    zone = engine.zone.Zone((8, 8, 1))
+    world[None].components[engine.zone.Zone] = zone
+    return world, zone
+
+
+def test_take_control_in_other_world(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Taking control of an actor cancels its turn in the queue of its own world, not the global world."""
+    global_world, global_zone = make_world()
+    monkeypatch.setattr(g, "world", global_world, raising=False)
+    global_zone.tqueue.schedule(0, global_world[object()])
+    world, zone = make_world()
+    actor = world[object()]
+    actor.components.update({Location: zone[3, 3, 0], Actor: Actor()})
+    ticket = actor.components[Actor].ticket
+    assert ticket is not None
+    Actor.take_control(actor)
+    assert not ticket.scheduled
+    assert len(zone.tqueue) == 0
+    assert len(global_zone.tqueue) == 1
+    assert zone.player is actor
@@ -0,0 +1,67 @@
+"""Compare `ChunkedArray` against a dense array for each supported index form."""
+
+from typing import Any
+
+import numpy as np
+import pytest
+
+from engine.chunked import ChunkedArray
+
+SHAPE = (10, 9, 3)
+CHUNK_SHAPE = (4, 4, 2)
+DTYPE = np.dtype([("tile", np.uint8), ("room_id", np.int32)])
+
+INDEXES: list[Any] = [
+    np.s_[3, 5, 1],
+    np.s_[-1, -2, 0],
+    np.s_[2:9, 1:7],
+    np.s_[..., 1],
+    np.s_[5],
+    np.s_[np.array([0, 4, 9, 4]), np.array([1, 8, 3, 2]), np.array([0, 2, 1, 1])],
+    np.s_[np.array([0, 4, 9]), np.array([1, 8, 3])],  # Fewer than 3 index arrays, such as from `line_where`.
+    np.s_[np.array([1, 6]), 2:8, 1],
+    np.s_[1:9, np.array([[0, 8], [4, 3]])],
+    np.s_[np.arange(SHAPE[0]) % 3 == 0],
+    np.s_[np.arange(SHAPE[0] * SHAPE[1] * SHAPE[2]).reshape(SHAPE) % 7 == 0],
+    np.s_[np.array([], dtype=int), np.array([], dtype=int)],
+]
+
+
+def make_arrays() -> tuple[ChunkedArray, np.ndarray[Any, Any]]:
+    """Return a chunked and a dense array with the same contents."""
+    dense = np.zeros(SHAPE, dtype=DTYPE)
+    dense["tile"] = np.arange(dense.size).reshape(SHAPE) % 251
+    dense["room_id"][2:7, 3:5] = 4
+    chunked = ChunkedArray(SHAPE, DTYPE, CHUNK_SHAPE)
+    chunked[...] = dense
+    return chunked, dense
+
+
+@pytest.mark.parametrize("key", INDEXES)
+def test_read(key: Any) -> None:  # noqa: ANN401
+    """Reads match a dense array."""
+    chunked, dense = make_arrays()
+    np.testing.assert_array_equal(chunked[key], dense[key])
+    np.testing.assert_array_equal(chunked["tile"][key], dense["tile"][key])
+
+
+@pytest.mark.parametrize("key", INDEXES)
+def test_write(key: Any) -> None:  # noqa: ANN401
+    """Writes of scalars and of arrays match a dense array."""
+    chunked, dense = make_arrays()
+    chunked["tile"][key] = 200
+    dense["tile"][key] = 200
+    np.testing.assert_array_equal(chunked[...], dense)
+    values = np.arange(np.asarray(dense["room_id"][key]).size).reshape(np.shape(dense["room_id"][key]))
+    chunked["room_id"][key] = values
+    dense["room_id"][key] = values
+    np.testing.assert_array_equal(chunked[...], dense)
+
+
+def test_write_fill_value_does_not_allocate() -> None:
+    """Chunks are only allocated by index array writes which change them."""
+    chunked = ChunkedArray(SHAPE, DTYPE, CHUNK_SHAPE)
+    chunked["tile"][np.array([0, 9]), np.array([0, 8])] = 0
+    assert not chunked.chunks
+    chunked["tile"][np.array([0, 9]), np.array([0, 8])] = 1
+    assert set(chunked.chunks) == {(0, 0, 0), (0, 0, 1), (2, 2, 0), (2, 2, 1)}
@@ -0,0 +1,39 @@
+"""Tests for `procgen.fenwick.FenwickTree`."""
+
+import bisect
+import itertools
+import random
+
+from procgen.fenwick import FenwickTree
+
+
+def test_matches_list() -> None:
+    """Sums and lookups match a plain list of weights while weights are appended and changed."""
+    rng = random.Random(0)
+    tree = FenwickTree()
+    weights: list[int] = []
+    for _ in range(200):
+        if weights and rng.random() < 0.5:  # noqa: PLR2004
+            index = rng.randrange(len(weights))
+            weights[index] = tree[index] = rng.choice((0, 0, 1, 5, 20))
+        else:
+            weights.append(rng.choice((0, 1, 5, 20)))
+            tree.append(weights[-1])
+        assert len(tree) == len(weights)
+        assert tree.total == sum(weights)
+        assert [tree.prefix_sum(end) for end in range(len(weights) + 1)] == [0, *itertools.accumulate(weights)]
+        cumulative = list(itertools.accumulate(weights))
+        for value in range(tree.total):
+            assert tree.bisect(value) == bisect.bisect_right(cumulative, value)
+
+
+def test_matches_choices() -> None:
+    """Bisecting a random fraction of the total picks the same index as `random.choices`."""
+    weights = [3, 0, 7, 1, 0, 0, 12, 5]
+    tree = FenwickTree()
+    for weight in weights:
+        tree.append(weight)
+    for seed in range(100):
+        expected = random.Random(seed).choices(range(len(weights)), weights)[0]
+        assert tree.bisect(random.Random(seed).random() * tree.total) == expected
+        assert weights[expected]
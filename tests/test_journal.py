@@ -0,0 +1,96 @@
+"""Tests for reading and writing `engine.journal` files."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+import tcod.ecs
+
+import engine.journal  # Must be imported before game.actions because of an import cycle.
+import game.actions
+
+if TYPE_CHECKING:
+    from game.action import Action
+
+ACTIONS: list[Action] = [
+    game.actions.Bump((1, 0, 0)),
+    game.actions.wait,
+    game.actions.Bump((-1, 1, -1)),
+    game.actions.PickupGeneral(),
+    game.actions.ReturnControlToPlayer(),
+]
+
+
+def write_records(path: Path, *records: bytes) -> None:
+    """Write a journal for seed 7 with `records`."""
+    path.write_bytes(engine.journal.HEADER.pack(engine.journal.MAGIC, engine.journal.VERSION, 7) + b"".join(records))
+
+
+def checksum_record(turn: int, state_hash: str) -> bytes:
+    """Return a checksum record."""
+    return bytes([engine.journal.TAG_CHECKSUM]) + engine.journal.CHECKSUM.pack(turn, bytes.fromhex(state_hash))
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    """Actions written by `JournalWriter` are read back in order."""
+    path = tmp_path / "game.journal"
+    writer = engine.journal.JournalWriter(path, seed=-42, checksum_interval=0)
+    for action in ACTIONS:
+        writer.record(tcod.ecs.World(), action)
+    writer.close()
+    journal = engine.journal.read_journal(path)
+    assert journal.seed == -42  # noqa: PLR2004
+    assert journal.actions == ACTIONS
+    assert journal.checksums == {}
+
+
+def test_checksums(tmp_path: Path) -> None:
+    """Checksum records are read by turn and don't add actions."""
+    path = tmp_path / "game.journal"
+    write_records(
+        path,
+        checksum_record(0, "0123456789abcdef"),
+        engine.journal.encode_action(ACTIONS[0]),
+        engine.journal.encode_action(ACTIONS[1]),
+        checksum_record(2, "fedcba9876543210"),
+        engine.journal.encode_action(ACTIONS[2]),
+    )
+    journal = engine.journal.read_journal(path)
+    assert journal.seed == 7  # noqa: PLR2004
+    assert journal.actions == ACTIONS[:3]
+    assert journal.checksums == {0: "0123456789abcdef", 2: "fedcba9876543210"}
+
+
+@pytest.mark.parametrize("cut", [1, 2, 3])
+def test_truncated_record(tmp_path: Path, cut: int) -> None:
+    """An incomplete last record is ignored."""
+    path = tmp_path / "game.journal"
+    records = [engine.journal.encode_action(ACTIONS[0]), engine.journal.encode_action(ACTIONS[2])]
+    write_records(path, *records)
+    path.write_bytes(path.read_bytes()[:-cut])
+    assert engine.journal.read_journal(path).actions == ACTIONS[:1]
+
+
+def test_unencodable_action() -> None:
+    """Actions the player can't take can't be recorded."""
+    with pytest.raises(TypeError):
+        engine.journal.encode_action(game.actions.Standby())
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        engine.journal.HEADER.pack(b"NOTAJRNL", engine.journal.VERSION, 0),
+        engine.journal.HEADER.pack(engine.journal.MAGIC, engine.journal.VERSION + 1, 0),
+        engine.journal.HEADER.pack(engine.journal.MAGIC, engine.journal.VERSION, 0) + bytes([255]),
+    ],
+)
+def test_invalid(tmp_path: Path, data: bytes) -> None:
+    """Invalid journals raise `JournalError`."""
+    path = tmp_path / "game.journal"
+    path.write_bytes(data)
+    with pytest.raises(engine.journal.JournalError):
+        engine.journal.read_journal(path)
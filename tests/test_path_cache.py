@@ -0,0 +1,56 @@
+"""Tests for `component.path_cache.PathCache`."""
+
+import tcod.ecs
+
+import engine.zone
+import tiles
+from component.actor import Actor
+from component.location import Location
+from component.path_cache import PathCache
+from component.physicality import Physicality
+
+
+def make_corridor() -> tuple[engine.zone.Zone, tcod.ecs.Entity]:
+    """Return a zone with a one tile wide corridor along y=2 and a blocking actor in it at (5, 2, 0)."""
+    world = tcod.ecs.World()
+    zone = engine.zone.Zone((11, 5, 1))
+    wall = zone.get_tile_index(tiles.metal_wall)
+    zone.set_tile_indexes((slice(None), 1, 0), wall)
+    zone.set_tile_indexes((slice(None), 3, 0), wall)
+    zone.index_rooms()
+    world[None].components[engine.zone.Zone] = zone
+    blocker = world[object()]
+    blocker.components[Location] = zone[5, 2, 0]
+    blocker.components[Physicality] = Physicality()
+    blocker.components[Actor] = Actor()
+    return zone, blocker
+
+
+def test_follows_path() -> None:
+    """Steps follow the cached path."""
+    zone, blocker = make_corridor()
+    blocker.components[Location] = zone[1, 2, 0]
+    cache = PathCache()
+    assert cache.get_step(zone[4, 2, 0], zone[9, 2, 0]) == (5, 2, 0)
+    cache.advance()
+    assert cache.get_step(zone[5, 2, 0], zone[9, 2, 0]) == (6, 2, 0)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_blocked_by_actor() -> None:
+    """A target cut off by another actor is reached once that actor moves away."""
+    zone, blocker = make_corridor()
+    cache = PathCache()
+    assert cache.get_step(zone[4, 2, 0], zone[9, 2, 0]) is None
+    blocker.components[Location] = zone[1, 2, 0]
+    assert cache.get_step(zone[4, 2, 0], zone[9, 2, 0]) == (5, 2, 0)
+
+
+def test_unreachable() -> None:
+    """A target walled off from the origin is remembered as unreachable."""
+    zone, _ = make_corridor()
+    zone.set_tile_indexes((7, 2, 0), zone.get_tile_index(tiles.metal_wall))
+    cache = PathCache()
+    assert cache.get_step(zone[8, 2, 0], zone[2, 2, 0]) is None
+    assert cache.get_step(zone[8, 2, 0], zone[2, 2, 0]) is None
+    assert (cache.hits, cache.misses) == (1, 1)
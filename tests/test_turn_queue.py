@@ -0,0 +1,83 @@
+"""Tests for `engine.turn_queue.TurnQueue`."""
+
+import pytest
+
+from engine.turn_queue import COMPACT_MIN_STALE, TurnQueue
+
+
+def test_same_time_is_fifo() -> None:
+    """Tickets for the same time are popped in the order they were scheduled."""
+    queue: TurnQueue[str] = TurnQueue()
+    queue.schedule(100, "a")
+    queue.schedule(50, "b")
+    queue.schedule(100, "c")
+    queue.schedule(50, "d")
+    assert [queue.pop().value for _ in range(4)] == ["b", "d", "a", "c"]
+    assert queue.time == 100  # noqa: PLR2004
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_schedule_is_relative_to_last_pop() -> None:
+    """Intervals start from the time of the last popped ticket."""
+    queue: TurnQueue[str] = TurnQueue()
+    queue.schedule(100, "a")
+    queue.pop()
+    ticket = queue.schedule(50, "b")
+    assert ticket.time == 150  # noqa: PLR2004
+
+
+def test_cancel() -> None:
+    """Cancelled tickets are skipped and cancelling again, or after a pop, does nothing."""
+    queue: TurnQueue[str] = TurnQueue()
+    a = queue.schedule(0, "a")
+    b = queue.schedule(0, "b")
+    queue.schedule(0, "c")
+    queue.cancel(b)
+    queue.cancel(b)
+    assert len(queue) == 2  # noqa: PLR2004
+    assert queue.pop() is a
+    queue.cancel(a)
+    assert len(queue) == 1
+    assert queue.pop().value == "c"
+    assert len(queue) == 0
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_len_across_compaction() -> None:
+    """Compacting the queue keeps its length and order."""
+    queue: TurnQueue[int] = TurnQueue()
+    tickets = [queue.schedule(i % 7, i) for i in range(COMPACT_MIN_STALE * 3)]
+    kept = [ticket for i, ticket in enumerate(tickets) if i % 3 == 0]
+    cancelled = 0
+    for i, ticket in enumerate(tickets):
+        if i % 3:
+            queue.cancel(ticket)
+            cancelled += 1
+        assert len(queue) == len(tickets) - cancelled
+    assert queue.stale < cancelled  # Compacted at least once.
+    assert len(queue) == len(kept)
+    expected = sorted(kept, key=lambda ticket: ticket.time)  # Stable, so same time tickets stay in order.
+    assert [queue.pop() for _ in range(len(queue))] == expected
+
+
+def test_schedule_many() -> None:
+    """Tickets from `schedule_many` keep their order and follow tickets already scheduled for that time."""
+    queue: TurnQueue[str] = TurnQueue()
+    queue.schedule(10, "a")
+    tickets = queue.schedule_many(10, ["b", "c", "d"])
+    assert [ticket.value for ticket in tickets] == ["b", "c", "d"]
+    assert queue.schedule_many(10, []) == []
+    assert len(queue) == 4  # noqa: PLR2004
+    assert [queue.pop().value for _ in range(4)] == ["a", "b", "c", "d"]
+
+
+def test_negative_interval() -> None:
+    """Scheduling into the past is an error."""
+    queue: TurnQueue[str] = TurnQueue()
+    with pytest.raises(ValueError, match="past"):
+        queue.schedule(-1, "a")
+    with pytest.raises(ValueError, match="past"):
+        queue.schedule_many(-1, ["a"])
+    assert len(queue) == 0
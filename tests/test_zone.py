@@ -0,0 +1,42 @@
+"""Tests for the movement costs of `engine.zone.Zone`."""
+
+import attrs
+import tcod.ecs
+
+import engine.zone
+from component.actor import Actor
+from component.location import Location
+from component.physicality import Physicality
+
+
+def make_zone() -> tuple[tcod.ecs.World, engine.zone.Zone]:
+    """Return a new world with an empty active zone whose costs are built."""
+    world = tcod.ecs.World()
+    zone = engine.zone.Zone((8, 8, 1))
+    zone.index_rooms()
+    world[None].components[engine.zone.Zone] = zone
+    assert zone.static_cost.any()
+    return world, zone
+
+
+def test_spawning_actor_keeps_static_cost_version() -> None:
+    """Actors only block `cost`, even though factories add their `Physicality` before their `Actor`."""
+    world, zone = make_zone()
+    version = zone.static_cost_version
+    actor = world[object()]
+    actor.components.update({Location: zone[3, 3, 0], Physicality: Physicality(), Actor: Actor()})
+    assert zone.cost[3, 3, 0] == 0
+    assert zone.static_cost[3, 3, 0] == 1
+    assert zone.static_cost_version == version
+
+
+def test_blocking_object_changes_static_cost_version() -> None:
+    """Blocking entities which aren't actors, such as doors, change `static_cost_version` as they open and close."""
+    world, zone = make_zone()
+    door = world[object()]
+    door.components.update({Location: zone[3, 3, 0], Physicality: Physicality()})
+    version = zone.static_cost_version
+    assert zone.static_cost[3, 3, 0] == 0
+    door.components[Physicality] = attrs.evolve(door.components[Physicality], blocking=False)
+    assert zone.static_cost[3, 3, 0] == 1
+    assert zone.static_cost_version != version